@@ -0,0 +1,219 @@
+# Standard libraries
+import os  # Operating system functions
+import time  # Timing for the recall/latency report
+import argparse  # Command line parsing
+
+# Third-party libraries
+import numpy as np  # NumPy for numerical operations
+
+# Local modules
+from gallery import GALLERY_DIRECTORY, ENCODING_SIZE, load_gallery  # Packed face gallery
+from matcher import FaceMatcher  # Brute-force reference matcher
+
+INDEX_FILE = "ivf_index.npz"
+
+
+class IVFIndex:
+    """Inverted-file approximate nearest-neighbour index over gallery rows.
+
+    Encodings are partitioned with k-means into n_lists cells. A search probes the
+    nprobe cells whose centroids are closest to the query and re-ranks every gallery
+    row in those cells exactly. The index only stores row numbers; the vectors are read
+    from the gallery's memory-mapped matrix.
+    """
+
+    def __init__(self, centroids, nprobe=4):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.centroid_sq_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        self.nprobe = nprobe
+        self.lists = [np.empty(0, dtype=np.int64) for _ in range(len(self.centroids))]
+        self.row_lists = np.empty(0, dtype=np.int64)  # Cell of every gallery row, -1 when not indexed
+        self.indexed_rows = 0  # Gallery rows below this number have already been seen by sync()
+        self.encodings = np.empty((0, ENCODING_SIZE), dtype=np.float32)
+
+    @classmethod
+    def build(cls, gallery, n_lists=None, nprobe=4, iterations=10, seed=0):
+        live = gallery.live_rows()
+        vectors = np.asarray(gallery.encodings[live], dtype=np.float32)
+        if n_lists is None:
+            n_lists = max(1, int(np.sqrt(len(live))))
+        index = cls(kmeans(vectors, n_lists, iterations, seed), nprobe)
+        index.sync(gallery)
+        return index
+
+    def __len__(self):
+        return int(np.count_nonzero(self.row_lists >= 0))
+
+    def _nearest_lists(self, vectors, count):
+        # Indices of the `count` closest centroids for every vector
+        distances = self.centroid_sq_norms[None, :] - 2.0 * (vectors @ self.centroids.T)
+        count = min(count, len(self.centroids))
+        if count == len(self.centroids):
+            return np.argsort(distances, axis=1)
+        nearest = np.argpartition(distances, count - 1, axis=1)[:, :count]
+        order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1)
+        return np.take_along_axis(nearest, order, axis=1)
+
+    def add(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return
+        if rows.max() >= len(self.row_lists):
+            grown = np.full(rows.max() + 1, -1, dtype=np.int64)
+            grown[:len(self.row_lists)] = self.row_lists
+            self.row_lists = grown
+
+        assignment = self._nearest_lists(np.asarray(self.encodings[rows], dtype=np.float32), 1)[:, 0]
+        self.row_lists[rows] = assignment
+        for cell in np.unique(assignment):
+            self.lists[cell] = np.concatenate([self.lists[cell], rows[assignment == cell]])
+
+    def remove(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[(rows < len(self.row_lists))]
+        rows = rows[self.row_lists[rows] >= 0]
+        for cell in np.unique(self.row_lists[rows]):
+            self.lists[cell] = self.lists[cell][~np.isin(self.lists[cell], rows)]
+        self.row_lists[rows] = -1
+
+    def sync(self, gallery):
+        # Bring the index up to date with rows appended or deleted since the last sync
+        self.encodings = gallery.encodings
+        live = gallery.live_mask()
+        indexed = np.flatnonzero(self.row_lists >= 0)
+        self.remove(indexed[~live[indexed]])
+        self.add(np.flatnonzero(live[self.indexed_rows:]) + self.indexed_rows)
+        self.indexed_rows = len(gallery.rows)
+        return self
+
+    def search(self, queries, k=32, nprobe=None):
+        # Gallery rows and exact distances of the k nearest indexed rows per query;
+        # missing slots are padded with row -1 and distance inf
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        nprobe = nprobe or self.nprobe
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        if not len(queries) or not len(self.centroids):
+            return rows, distances
+
+        probes = self._nearest_lists(queries, nprobe)
+        for q, (query, cells) in enumerate(zip(queries, probes)):
+            candidates = np.concatenate([self.lists[cell] for cell in cells])
+            if not len(candidates):
+                continue
+            candidate_distances = np.linalg.norm(np.asarray(self.encodings[candidates], dtype=np.float32) - query, axis=1)
+            keep = min(k, len(candidates))
+            best = np.argpartition(candidate_distances, keep - 1)[:keep] if keep < len(candidates) else np.arange(keep)
+            best = best[np.argsort(candidate_distances[best])]
+            rows[q, :keep] = candidates[best]
+            distances[q, :keep] = candidate_distances[best]
+        return rows, distances
+
+    def save(self, path):
+        np.savez(path, centroids=self.centroids, row_lists=self.row_lists,
+                 indexed_rows=self.indexed_rows, nprobe=self.nprobe)
+
+    @classmethod
+    def load(cls, path, gallery):
+        data = np.load(path)
+        index = cls(data["centroids"], int(data["nprobe"]))
+        index.row_lists = data["row_lists"]
+        index.indexed_rows = int(data["indexed_rows"])
+        for cell in range(len(index.centroids)):
+            index.lists[cell] = np.flatnonzero(index.row_lists == cell)
+        return index.sync(gallery)
+
+
+def kmeans(vectors, n_clusters, iterations=10, seed=0):
+    # Plain Lloyd's k-means seeded from random samples
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(vectors))
+    if n_clusters == 0:
+        return np.empty((0, ENCODING_SIZE), dtype=np.float32)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    vector_sq_norms = np.einsum("ij,ij->i", vectors, vectors)
+
+    for _ in range(iterations):
+        distances = vector_sq_norms[:, None] + np.einsum("ij,ij->i", centroids, centroids)[None, :] - 2.0 * (vectors @ centroids.T)
+        assignment = np.argmin(distances, axis=1)
+        counts = np.bincount(assignment, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        occupied = counts > 0
+        centroids[occupied] = sums[occupied] / counts[occupied, None]
+        # Re-seed empty cells from random samples so every cell stays useful
+        if not occupied.all():
+            centroids[~occupied] = vectors[rng.choice(len(vectors), int((~occupied).sum()), replace=False)]
+    return centroids.astype(np.float32)
+
+
+def load_index(gallery, gallery_directory=GALLERY_DIRECTORY):
+    # Saved index for this gallery synced with any changes since it was written, or None
+    path = os.path.join(gallery_directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return None
+    index = IVFIndex.load(path, gallery)
+    index.save(path)
+    return index
+
+
+def refresh_index(gallery, gallery_directory=GALLERY_DIRECTORY):
+    # Keep a saved index in step after a register/edit/delete; no-op when ANN is not enabled
+    return load_index(gallery, gallery_directory)
+
+
+def recall_report(gallery, index, nprobes=(1, 2, 4, 8, 16), confidence_threshold=0.7, noise=0.03, max_queries=2000, seed=0):
+    # Compare ANN decisions against brute force on noisy copies of gallery samples
+    rng = np.random.default_rng(seed)
+    live = gallery.live_rows()
+    picked = rng.choice(live, min(max_queries, len(live)), replace=False)
+    queries = np.asarray(gallery.encodings[picked], dtype=np.float32) + rng.normal(0, noise, (len(picked), ENCODING_SIZE)).astype(np.float32)
+
+    exact = FaceMatcher.from_gallery(gallery)
+    start = time.perf_counter()
+    reference = exact.identify(queries, confidence_threshold)
+    brute_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    # True nearest gallery row per query, computed in chunks to bound memory
+    live_encodings = np.asarray(gallery.encodings[live], dtype=np.float32)
+    live_sq_norms = np.einsum("ij,ij->i", live_encodings, live_encodings)
+    nearest_rows = np.concatenate([live[np.argmin(FaceMatcher._euclidean(chunk, live_encodings, live_sq_norms), axis=1)]
+                                   for chunk in np.array_split(queries, max(1, len(queries) // 256))])
+
+    report = []
+    for nprobe in nprobes:
+        approximate = FaceMatcher.from_gallery(gallery, index=index, nprobe=nprobe)
+        start = time.perf_counter()
+        decisions = approximate.identify(queries, confidence_threshold)
+        ann_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        identical = sum(a[:2] == b[:2] for a, b in zip(reference, decisions))
+        rows, _ = index.search(queries, k=1, nprobe=nprobe)
+        recall = float(np.mean(rows[:, 0] == nearest_rows))
+        report.append({"nprobe": nprobe, "recall_at_1": recall, "identical_decisions": identical / len(queries),
+                       "ann_ms_per_face": ann_ms, "brute_ms_per_face": brute_ms})
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or evaluate the approximate nearest-neighbour index.")
+    parser.add_argument("--gallery-dir", default=GALLERY_DIRECTORY)
+    parser.add_argument("--build", action="store_true", help="(re)build the index from the gallery")
+    parser.add_argument("--lists", type=int, default=None, help="number of k-means cells (default sqrt(rows))")
+    parser.add_argument("--nprobe", type=int, default=4, help="cells probed per query")
+    parser.add_argument("--report", action="store_true", help="print a recall/latency report against brute force")
+    parser.add_argument("--threshold", type=float, default=0.7)
+    args = parser.parse_args()
+
+    gallery = load_gallery(args.gallery_dir)
+    index_path = os.path.join(args.gallery_dir, INDEX_FILE)
+    if args.build or not os.path.exists(index_path):
+        index = IVFIndex.build(gallery, args.lists, args.nprobe)
+        index.save(index_path)
+        print(f"Indexed {len(index)} rows into {len(index.centroids)} cells at {index_path}")
+    else:
+        index = load_index(gallery, args.gallery_dir)
+
+    if args.report:
+        print("nprobe  recall@1  identical  ann ms/face  brute ms/face")
+        for row in recall_report(gallery, index, confidence_threshold=args.threshold):
+            print(f"{row['nprobe']:>6}  {row['recall_at_1']:>8.4f}  {row['identical_decisions']:>9.4f}  {row['ann_ms_per_face']:>11.4f}  {row['brute_ms_per_face']:>13.4f}")
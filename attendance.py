@@ -0,0 +1,284 @@
+# Standard libraries
+import os  # Operating system functions
+import re  # Regular expressions
+import csv  # CSV file handling
+import queue  # Hand-off between the frame loop and the writer thread
+import sqlite3  # Embedded attendance database
+import atexit  # Commit queued records when the interpreter exits
+import argparse  # Command line parsing
+import threading  # Background writer thread
+
+# Python's built-in libraries
+from datetime import datetime, timedelta  # Date and time handling
+
+CSV_DIRECTORY = "csv_data"
+CSV_HEADER = ["Roll No", "Date", "Name"]  # Header row with columns reordered
+CSV_NAME_PATTERN = re.compile(r"^([A-Za-z]+)_(\d{4})\.csv$")
+DATABASE_FILE = "attendance.db"
+
+
+def monthly_csv_path(now=None, directory=CSV_DIRECTORY):
+    # csv_data/<Month>_<Year>.csv for the given moment
+    now = now or datetime.now()
+    return os.path.join(directory, f"{now.strftime('%B')}_{now.strftime('%Y')}.csv")
+
+
+def append_csv_rows(file_name, rows):
+    # Append (roll_no, DD-MM-YYYY, name) rows, writing the header for a new file
+    header_exists = os.path.exists(file_name)
+    with open(file_name, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if not header_exists:
+            writer.writerow(CSV_HEADER)
+        writer.writerows(rows)
+
+
+class AttendanceLog:
+    """Marks attendance in the monthly CSV files, at most once per student per interval."""
+
+    def __init__(self, directory=CSV_DIRECTORY, attendance_interval=timedelta(hours=24)):
+        self.directory = directory
+        self.attendance_interval = attendance_interval
+        self.last_attendance_time = {}  # Keyed by roll number; names are not unique
+
+    def mark(self, name, roll_no, now=None):
+        # Returns True when a new record was written
+        now = now or datetime.now()
+
+        # Get the last marked attendance time for the student
+        last_marked_time = self.last_attendance_time.get(roll_no, datetime.min)
+        if now - last_marked_time < self.attendance_interval:
+            return False
+
+        # Mark attendance if the time interval is reached
+        self.last_attendance_time[roll_no] = now
+        file_name = monthly_csv_path(now, self.directory)
+        append_csv_rows(file_name, [[roll_no, now.strftime('%d-%m-%Y'), name]])
+        print("\n\nAttendance Marked", f"\n\nRecord added to {file_name}: {roll_no}, {now.strftime('%d-%m-%Y')}, {name}\n")
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class AttendanceStore(AttendanceLog):
+    """SQLite-backed attendance log with persistent dedup state and batched writes.
+
+    The database runs in WAL mode with an index on (roll_no, date). A last_marked table
+    holds one row per student, so the 24 hour dedup state survives restarts and loads in
+    O(students); back-filled marks older than that are checked per (roll_no, date) against
+    the index. mark() only checks this state and queues the record; a writer
+    thread commits queued records in batches and mirrors them into the monthly CSV files
+    so existing tools keep working. On first use the store imports csv_data/ history.
+    """
+
+    def __init__(self, directory=CSV_DIRECTORY, attendance_interval=timedelta(hours=24),
+                 database=None, mirror_csv=True, batch_size=64, flush_interval=0.5, retry_interval=5.0):
+        super().__init__(directory, attendance_interval)
+        self.database = database or os.path.join(directory, DATABASE_FILE)
+        self.mirror_csv = mirror_csv
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.marked_days = set()  # (roll_no, ISO date) known to have a record, from marks and lookups
+
+        os.makedirs(directory, exist_ok=True)
+        is_new = not os.path.exists(self.database)
+        connection = connect(self.database)
+        if is_new:
+            import_csv_history(connection, directory)
+        for roll_no, marked_at in connection.execute("SELECT roll_no, marked_at FROM last_marked"):
+            self.last_attendance_time[roll_no] = datetime.fromisoformat(marked_at)
+        connection.close()
+
+        self.pending = queue.Queue()
+        self.closed = False
+        self.writer = threading.Thread(target=self._write_loop, name="attendance-writer", daemon=True)
+        self.writer.start()
+        # The writer is a daemon so a forgotten close() cannot hang the exit; this makes
+        # sure whatever it still has queued is committed first
+        atexit.register(self.close)
+
+    def mark(self, name, roll_no, now=None):
+        # Returns True when a new record was queued; never touches the disk on the caller's thread
+        # for live marks. Marks earlier than the student's latest (batch_recognize --date
+        # back-filling recorded lectures) are deduplicated per (roll_no, date) instead
+        now = now or datetime.now()
+        last_marked_time = self.last_attendance_time.get(roll_no, datetime.min)
+        if now >= last_marked_time:
+            if now - last_marked_time < self.attendance_interval:
+                return False
+            self.last_attendance_time[roll_no] = now
+        elif self._marked_on(roll_no, now.date().isoformat()):
+            return False
+
+        self.marked_days.add((roll_no, now.date().isoformat()))
+        self.pending.put((roll_no, name, now))
+        print("\n\nAttendance Marked", f"\n\nRecord queued: {roll_no}, {now.strftime('%d-%m-%Y')}, {name}\n")
+        return True
+
+    def _marked_on(self, roll_no, day):
+        # Whether the student has a record on this ISO date, queued or in the database
+        if (roll_no, day) in self.marked_days:
+            return True
+        connection = sqlite3.connect(self.database)
+        try:
+            found = connection.execute("SELECT 1 FROM attendance WHERE roll_no = ? AND date = ? LIMIT 1", (roll_no, day)).fetchone()
+        finally:
+            connection.close()
+        if found:
+            self.marked_days.add((roll_no, day))
+        return found is not None
+
+    def flush(self):
+        # Block until every queued record has been handled; any the disk refused are retried
+        self.pending.join()
+
+    def close(self):
+        # Commit everything queued and stop the writer; safe to call more than once
+        if self.closed:
+            return
+        self.closed = True
+        self.flush()
+        self.pending.put(None)
+        self.writer.join(timeout=5)
+        atexit.unregister(self.close)
+
+    def _write_loop(self):
+        # A failed write never kills this thread: records that could not be committed, and
+        # committed rows that could not be mirrored (e.g. the CSV is open in Excel), are kept
+        # and retried with the next batch, or every retry_interval while nothing new arrives
+        connection = connect(self.database)
+        uncommitted, unmirrored = [], []
+        running = True
+        while running:
+            try:
+                item = self.pending.get(timeout=self.retry_interval if uncommitted or unmirrored else None)
+            except queue.Empty:
+                item = False  # Nothing new; just retry what is held back
+            batch = []
+            try:
+                # Gather whatever else arrives within flush_interval, up to batch_size records
+                while item:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self.pending.get(timeout=self.flush_interval)
+                    except queue.Empty:
+                        break
+                if item is None:
+                    running = False
+
+                uncommitted += batch
+                if uncommitted:
+                    try:
+                        self._commit(connection, uncommitted)
+                    except Exception as error:  # Locked or unwritable database; keep the records
+                        print(f"Could not save {len(uncommitted)} attendance records, will retry: {error}")
+                    else:
+                        if self.mirror_csv:
+                            unmirrored += uncommitted
+                        uncommitted = []
+                if unmirrored:
+                    unmirrored = self._mirror(unmirrored)
+            finally:
+                for _ in range(len(batch) + (0 if running else 1)):
+                    self.pending.task_done()
+        if uncommitted or unmirrored:
+            print(f"Closing with {len(uncommitted)} attendance records unsaved and {len(unmirrored)} missing from the CSV files")
+        connection.close()
+
+    def _commit(self, connection, batch):
+        with connection:
+            connection.executemany("INSERT INTO attendance (roll_no, date, name, marked_at) VALUES (?, ?, ?, ?)",
+                                   [(roll_no, now.date().isoformat(), name, now.isoformat()) for roll_no, name, now in batch])
+            connection.executemany("INSERT INTO last_marked (roll_no, marked_at) VALUES (?, ?) "
+                                   "ON CONFLICT(roll_no) DO UPDATE SET marked_at = MAX(marked_at, excluded.marked_at)",
+                                   [(roll_no, now.isoformat()) for roll_no, _, now in batch])
+
+    def _mirror(self, records):
+        # Append committed records to their monthly CSV files; returns those still to be written
+        by_file = {}
+        for record in records:
+            by_file.setdefault(monthly_csv_path(record[2], self.directory), []).append(record)
+        failed = []
+        for file_name, file_records in by_file.items():
+            try:
+                append_csv_rows(file_name, [[roll_no, now.strftime('%d-%m-%Y'), name] for roll_no, name, now in file_records])
+            except OSError as error:  # e.g. the file is open in Excel on Windows
+                print(f"Could not update {file_name}, will retry: {error}")
+                failed += file_records
+        return failed
+
+
+def connect(database):
+    connection = sqlite3.connect(database)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; commits no longer fsync every time
+    connection.execute("CREATE TABLE IF NOT EXISTS attendance (roll_no TEXT NOT NULL, date TEXT NOT NULL, name TEXT NOT NULL, marked_at TEXT NOT NULL)")
+    connection.execute("CREATE INDEX IF NOT EXISTS attendance_roll_date ON attendance (roll_no, date)")
+    connection.execute("CREATE TABLE IF NOT EXISTS last_marked (roll_no TEXT PRIMARY KEY, marked_at TEXT NOT NULL)")
+    return connection
+
+
+def import_csv_history(connection, directory=CSV_DIRECTORY):
+    # Load every Month_Year.csv into the database so dedup and exports start from the real history
+    rows = []
+    for file in sorted(os.listdir(directory)):
+        if not CSV_NAME_PATTERN.match(file):
+            continue
+        with open(os.path.join(directory, file), newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # Skip the header row
+            for record in reader:
+                if len(record) != 3:
+                    continue
+                roll_no, date, name = record
+                try:
+                    marked_at = datetime.strptime(date.strip(), '%d-%m-%Y')
+                except ValueError:
+                    continue  # Hand-edited or damaged row; skipped, as reporting does
+                rows.append((roll_no, marked_at.date().isoformat(), name, marked_at.isoformat()))
+
+    with connection:
+        connection.executemany("INSERT INTO attendance (roll_no, date, name, marked_at) VALUES (?, ?, ?, ?)", rows)
+        connection.execute("INSERT OR REPLACE INTO last_marked (roll_no, marked_at) "
+                           "SELECT roll_no, MAX(marked_at) FROM attendance GROUP BY roll_no")
+    return len(rows)
+
+
+def export_monthly_csv(month, directory=CSV_DIRECTORY, database=None):
+    # Rewrite csv_data/<Month>_<Year>.csv for the month containing `month` from the database
+    connection = connect(database or os.path.join(directory, DATABASE_FILE))
+    start = month.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    rows = connection.execute("SELECT roll_no, date, name FROM attendance WHERE date >= ? AND date < ? ORDER BY marked_at",
+                              (start.date().isoformat(), end.date().isoformat())).fetchall()
+    connection.close()
+
+    file_name = monthly_csv_path(start, directory)
+    temp_name = file_name + ".tmp"
+    with open(temp_name, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for roll_no, date, name in rows:
+            writer.writerow([roll_no, datetime.fromisoformat(date).strftime('%d-%m-%Y'), name])
+    os.replace(temp_name, file_name)
+    return file_name, len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the attendance database.")
+    parser.add_argument("--export", metavar="MONTH_YEAR", help="rewrite csv_data/<Month>_<Year>.csv from the database, e.g. October_2023")
+    parser.add_argument("--directory", default=CSV_DIRECTORY)
+    args = parser.parse_args()
+
+    store = AttendanceStore(args.directory)
+    store.close()
+    if args.export:
+        file_name, count = export_monthly_csv(datetime.strptime(args.export, "%B_%Y"), args.directory)
+        print(f"Exported {count} records to {file_name}")
@@ -0,0 +1,138 @@
+# Standard libraries
+import os  # Operating system functions
+import sys  # Standard output for JSON lines
+import json  # JSON lines output
+import argparse  # Command line parsing
+import multiprocessing  # Spawn context for the process pool
+
+# Third-party libraries
+import cv2  # OpenCV for computer vision tasks
+
+# Python's built-in libraries
+from datetime import datetime  # Date and time handling
+from concurrent.futures import ProcessPoolExecutor, as_completed  # One task per input
+
+# Local modules
+from gallery import load_gallery  # Packed, memory-mapped face gallery
+from matcher import FaceMatcher, UNKNOWN_ROLL_NO  # Vectorized face matcher
+from tracker import FaceTracker, PENDING_ROLL_NO  # Track faces between frames to skip redundant encodings
+from detection import FaceDetector, encode_faces  # Downscaled detection, full-resolution encoding
+from pipeline import detect_frame, identify_frame  # Same per-frame stages as take_attendance
+from multicam import share_arrays, attach_arrays  # Gallery shared between worker processes
+from attendance import AttendanceStore  # Attendance database and monthly CSV files
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Per-process state set up once by init_worker
+worker_state = {}
+
+
+def iter_frames(path, stride=1, max_frames=None):
+    # Yield (frame_index, seconds, frame) from a video file or a directory of images
+    stride = max(1, stride)
+    produced = 0
+    if os.path.isdir(path):
+        files = sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        for index in range(0, len(files), stride):
+            frame = cv2.imread(os.path.join(path, files[index]))
+            if frame is None:
+                continue
+            yield index, float(index), frame
+            produced += 1
+            if max_frames and produced >= max_frames:
+                return
+        return
+
+    video_capture = cv2.VideoCapture(path)
+    fps = video_capture.get(cv2.CAP_PROP_FPS) or 25.0
+    index = 0
+    try:
+        while True:
+            # grab() skips the decode step for frames the stride throws away
+            if index % stride:
+                if not video_capture.grab():
+                    return
+                index += 1
+                continue
+            ret, frame = video_capture.read()
+            if not ret:
+                return
+            yield index, index / fps, frame
+            index += 1
+            produced += 1
+            if max_frames and produced >= max_frames:
+                return
+    finally:
+        video_capture.release()
+
+
+def init_worker(block_name, layout, metadata, detector_options):
+    block, arrays = attach_arrays(block_name, layout)
+    worker_state["block"] = block
+    worker_state["matcher"] = FaceMatcher.from_state(arrays, metadata)
+    worker_state["detector"] = FaceDetector(**detector_options)
+
+
+def recognise_input(path, stride, confidence_threshold, max_frames):
+    # Run one video or image folder through detection, tracking, encoding and matching
+    matcher = worker_state["matcher"]
+    detector = worker_state["detector"]
+    tracker = FaceTracker(confidence_threshold)
+
+    records = []
+    for index, seconds, frame in iter_frames(path, stride, max_frames):
+        # Images in a folder are unrelated, so only track across frames of a video
+        if os.path.isdir(path):
+            tracker = FaceTracker(confidence_threshold)
+        result = detect_frame(detector, tracker, encode_faces, index + 1, seconds, frame, seconds)
+        result = identify_frame(matcher, tracker, result, confidence_threshold)
+        for (top, right, bottom, left), (name, roll_no, confidence) in zip(result.face_locations, result.identities):
+            records.append({"input": path, "frame": index, "seconds": round(seconds, 3), "name": name, "roll_no": roll_no,
+                            "confidence": round(float(confidence), 4), "box": [int(top), int(right), int(bottom), int(left)]})
+    return path, records
+
+
+def run(inputs, stride=1, confidence_threshold=0.7, workers=None, dry_run=False, detector_options=None, attendance_date=None, max_frames=None):
+    arrays, metadata = FaceMatcher.from_gallery(load_gallery()).state()
+    block, layout = share_arrays(arrays)
+    attendance_log = None if dry_run else AttendanceStore()
+    marked = 0
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=init_worker, initargs=(block.name, layout, metadata, detector_options or {})) as executor:
+            futures = [executor.submit(recognise_input, path, stride, confidence_threshold, max_frames) for path in inputs]
+            for future in as_completed(futures):
+                path, records = future.result()
+                for record in records:
+                    if dry_run:
+                        sys.stdout.write(json.dumps(record) + "\n")
+                    elif record["roll_no"] not in (UNKNOWN_ROLL_NO, PENDING_ROLL_NO):
+                        marked += attendance_log.mark(record["name"], record["roll_no"], attendance_date or datetime.now())
+                print(f"{path}: {len(records)} faces", file=sys.stderr)
+    finally:
+        block.close()
+        block.unlink()
+        if attendance_log is not None:
+            attendance_log.close()
+    return marked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recognise faces in recorded video files or image folders without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="video files and/or directories of images")
+    parser.add_argument("--stride", type=int, default=1, help="process every Nth frame")
+    parser.add_argument("--max-frames", type=int, default=None, help="stop each input after this many processed frames")
+    parser.add_argument("--threshold", type=float, default=0.7, help="minimum confidence to accept a match")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--detector", default="hog", help="detector backend: hog, cnn, haar, lbp or dnn")
+    parser.add_argument("--scale", type=float, default=0.5, help="detection scale factor")
+    parser.add_argument("--date", default=None, help="mark attendance on this DD-MM-YYYY date instead of today")
+    parser.add_argument("--dry-run", action="store_true", help="print JSON lines to stdout instead of writing CSVs")
+    args = parser.parse_args()
+
+    attendance_date = datetime.strptime(args.date, "%d-%m-%Y") if args.date else None
+    marked = run(args.inputs, args.stride, args.threshold, args.workers, args.dry_run,
+                 {"backend": args.detector, "scale": args.scale}, attendance_date, args.max_frames)
+    if not args.dry_run:
+        print(f"{marked} attendance records written", file=sys.stderr)
@@ -0,0 +1,297 @@
+# Standard libraries
+import os  # Operating system functions
+import sys  # Exit status for regressions
+import json  # Machine-readable results
+import time  # Timings
+import shutil  # Scratch copies of fixture galleries
+import argparse  # Command line parsing
+import platform  # Machine description for the results file
+import tempfile  # Scratch directories
+
+# Third-party libraries
+import numpy as np  # NumPy for numerical operations
+
+# Local modules
+from gallery import ENCODING_SIZE, FaceGallery, load_gallery  # Packed, memory-mapped face gallery
+from matcher import FaceMatcher  # Vectorized face matcher
+from ann_index import IVFIndex  # Optional approximate nearest-neighbour index
+
+FIXTURE_DIRECTORY = "benchmark_data"
+FIXTURE_VERSION = "v2"  # Bumped when fixture contents change, so stale cached fixtures are not reused
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+SAMPLES_PER_STUDENT = 5
+STUDENT_SPREAD = 0.1  # Per-dimension spread of student centres; gives ~1.1 between students
+SAMPLE_NOISE = 0.02  # Per-dimension spread of samples around their centre; gives ~0.3 within a student
+
+
+def student_name(number):
+    # Letters-only name for a student number (0 -> "Student A", 26 -> "Student BA"), so
+    # fixtures pass the same validation as names entered in the app
+    letters = ""
+    while True:
+        number, digit = divmod(number, 26)
+        letters = chr(ord("A") + digit) + letters
+        if not number:
+            return f"Student {letters}"
+
+
+def student_roll_no(number):
+    # Digits-only roll number, 1 to 8 digits like real ones
+    return f"{number + 1:08d}"
+
+
+def synthetic_encodings(size, seed=0):
+    # size encodings for size // SAMPLES_PER_STUDENT students, clustered like real face encodings
+    rng = np.random.default_rng(seed)
+    students = max(1, size // SAMPLES_PER_STUDENT)
+    centres = rng.normal(0, STUDENT_SPREAD, (students, ENCODING_SIZE))
+    owners = np.arange(size) % students
+    encodings = centres[owners] + rng.normal(0, SAMPLE_NOISE, (size, ENCODING_SIZE))
+    return encodings, owners
+
+
+def build_npy_fixture(directory, size, seed=0):
+    # Legacy npy_data layout: one float64 "Name_Roll_N.npy" file per sample
+    os.makedirs(directory, exist_ok=True)
+    encodings, owners = synthetic_encodings(size, seed)
+    samples = {}
+    for encoding, owner in zip(encodings, owners):
+        samples[owner] = samples.get(owner, 0) + 1
+        np.save(os.path.join(directory, f"{student_name(owner)}_{student_roll_no(owner)}_{samples[owner]}.npy"), encoding)
+
+
+def build_gallery_fixture(directory, size, seed=0):
+    # Packed gallery with the same students and samples as build_npy_fixture
+    encodings, owners = synthetic_encodings(size, seed)
+    students = {}
+    for encoding, owner in zip(encodings, owners):
+        students.setdefault(owner, []).append(encoding)
+    FaceGallery(directory).add_students([(student_name(owner), student_roll_no(owner), samples) for owner, samples in students.items()])
+
+
+def fixture_paths(fixture_directory, size, seed):
+    # Fixtures are cached by size and seed, so reruns and baseline comparisons use identical data
+    base = os.path.join(fixture_directory, f"n{size}_seed{seed}_{FIXTURE_VERSION}")
+    return os.path.join(base, "npy_data"), os.path.join(base, "gallery_data")
+
+
+def timed_call(function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    return time.perf_counter() - start, value
+
+
+def load_npy_directory(directory):
+    # What take_attendance did before the packed gallery: one np.load per file
+    known_face_encodings = []
+    for file in os.listdir(directory):
+        if file.endswith('.npy'):
+            known_face_encodings.append(np.load(os.path.join(directory, file)))
+    return known_face_encodings
+
+
+def synthetic_queries(gallery, frames, faces_per_frame, stranger_rate=0.25, seed=0):
+    # Noisy copies of enrolled samples plus a share of never-enrolled faces, one batch per frame
+    rng = np.random.default_rng(seed + 1)
+    live = gallery.live_rows()
+    count = frames * faces_per_frame
+    queries = np.asarray(gallery.encodings[rng.choice(live, count)], dtype=np.float32)
+    queries += rng.normal(0, SAMPLE_NOISE, queries.shape).astype(np.float32)
+    strangers = rng.random(count) < stranger_rate
+    queries[strangers] = rng.normal(0, STUDENT_SPREAD, (int(strangers.sum()), ENCODING_SIZE))
+    return queries.reshape(frames, faces_per_frame, ENCODING_SIZE)
+
+
+def latency_summary(seconds):
+    seconds = np.asarray(seconds) * 1000
+    return {"p50_ms": float(np.percentile(seconds, 50)), "p95_ms": float(np.percentile(seconds, 95)),
+            "p99_ms": float(np.percentile(seconds, 99))}
+
+
+def benchmark_gallery_load(results, size, npy_directory, gallery_directory, max_npy):
+    if size <= max_npy:
+        seconds, _ = timed_call(load_npy_directory, npy_directory)
+        results[f"gallery_load/npy_files/n={size}"] = {"value": seconds, "unit": "s", "better": "lower"}
+        with tempfile.TemporaryDirectory() as scratch:
+            seconds, _ = timed_call(load_gallery, os.path.join(scratch, "gallery_data"), npy_directory)
+        results[f"gallery_load/migrate/n={size}"] = {"value": seconds, "unit": "s", "better": "lower"}
+    seconds, gallery = timed_call(lambda: FaceGallery(gallery_directory).load())
+    results[f"gallery_load/packed/n={size}"] = {"value": seconds, "unit": "s", "better": "lower"}
+    seconds, _ = timed_call(FaceMatcher.from_gallery, gallery)
+    results[f"gallery_load/matcher_build/n={size}"] = {"value": seconds, "unit": "s", "better": "lower"}
+    return gallery
+
+
+def benchmark_matching(results, size, gallery, frames, faces_per_frame, confidence_threshold, ann, seed):
+    queries = synthetic_queries(gallery, frames, faces_per_frame, seed=seed)
+    matchers = {"exact": FaceMatcher.from_gallery(gallery)}
+    if ann:
+        matchers["ivf"] = FaceMatcher.from_gallery(gallery, index=IVFIndex.build(gallery, seed=seed))
+    for label, matcher in matchers.items():
+        matcher.identify(queries[0], confidence_threshold)  # Warm-up
+        latencies = []
+        for frame_queries in queries:
+            start = time.perf_counter()
+            matcher.identify(frame_queries, confidence_threshold)
+            latencies.append(time.perf_counter() - start)
+        for statistic, value in latency_summary(latencies).items():
+            results[f"matching/{label}/{statistic}/n={size}"] = {"value": value, "unit": "ms", "better": "lower"}
+        results[f"matching/{label}/frames_per_second/n={size}"] = {"value": len(latencies) / sum(latencies), "unit": "fps", "better": "higher"}
+
+
+def benchmark_operations(results, size, gallery_directory, repeats, seed):
+    # Register, edit and delete on a scratch copy so the cached fixture stays untouched
+    rng = np.random.default_rng(seed + 2)
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = os.path.join(scratch, "gallery_data")
+        shutil.copytree(gallery_directory, directory)
+        gallery = FaceGallery(directory).load()
+        timings = {"register": [], "edit": [], "delete": []}
+        for i in range(repeats):
+            roll_no = f"9{i:07d}"  # Above every fixture roll number
+            encodings = rng.normal(0, STUDENT_SPREAD, (SAMPLES_PER_STUDENT, ENCODING_SIZE))
+            timings["register"].append(timed_call(gallery.add_student, f"Bench {student_name(i)}", roll_no, encodings)[0])
+            timings["edit"].append(timed_call(gallery.rename_student, roll_no, f"Renamed {student_name(i)}")[0])
+            timings["delete"].append(timed_call(gallery.delete_student, roll_no)[0])
+    for operation, seconds in timings.items():
+        for statistic, value in latency_summary(seconds).items():
+            results[f"operations/{operation}/{statistic}/n={size}"] = {"value": value, "unit": "ms", "better": "lower"}
+
+
+def make_synthetic_video(path, frames=300, size=(640, 480), fps=30, face_image=None, seed=0):
+    # Video fixture: a face photo (if given) drifting across a noisy background, otherwise
+    # moving shapes, which still exercises capture, colour conversion and detection
+    import cv2  # Only needed for the video benchmarks
+
+    rng = np.random.default_rng(seed)
+    width, height = size
+    face = cv2.imread(face_image) if face_image else None
+    if face is not None:
+        face = cv2.resize(face, (height // 2 * face.shape[1] // face.shape[0], height // 2))
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    for i in range(frames):
+        frame = rng.integers(0, 40, (height, width, 3), dtype=np.uint8)
+        x = int((width - (face.shape[1] if face is not None else 80)) * (0.5 + 0.5 * np.sin(i / 30)))
+        if face is not None:
+            frame[height // 4:height // 4 + face.shape[0], x:x + face.shape[1]] = face
+        else:
+            cv2.circle(frame, (x + 40, height // 2), 40, (200, 180, 160), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def benchmark_end_to_end(results, size, gallery, video_path, confidence_threshold):
+    # Whole take_attendance pipeline on a video file as fast as it will go; needs OpenCV and
+    # face_recognition, so they are imported only when a video benchmark is requested
+    import cv2  # OpenCV for computer vision tasks
+    from metrics import Metrics  # Per-stage timings and counters
+    from pipeline import RecognitionPipeline  # Threaded recognition pipeline
+
+    metrics = Metrics()
+    matcher = FaceMatcher.from_gallery(gallery)
+    video_capture = cv2.VideoCapture(video_path)
+    # No latency cut-off: every frame the capture thread reads is allowed to finish
+    pipeline = RecognitionPipeline(video_capture, matcher, confidence_threshold, max_latency=float("inf"),
+                                   stop_at_end=True, metrics=metrics)
+    start = last_result_at = time.perf_counter()
+    pipeline.start()
+    delivered = 0
+    # Once the file has been read, keep draining until the later stages have gone quiet
+    while not pipeline.finished.is_set() or time.perf_counter() - last_result_at < 1.0:
+        result = pipeline.next_result(timeout=0.05)
+        if result is None:
+            continue
+        metrics.frame_displayed(result.captured_at)
+        delivered += 1
+        last_result_at = time.perf_counter()
+    elapsed = last_result_at - start
+    pipeline.stop()
+    video_capture.release()
+
+    results[f"end_to_end/frames_per_second/n={size}"] = {"value": delivered / max(elapsed, 1e-9), "unit": "fps", "better": "higher"}
+    results[f"end_to_end/dropped_frames/n={size}"] = {"value": pipeline.dropped, "unit": "frames", "better": "lower"}
+    for stage, summary in metrics.snapshot()["stages"].items():
+        if "p95_ms" in summary:
+            results[f"end_to_end/{stage}/p95_ms/n={size}"] = {"value": summary["p95_ms"], "unit": "ms", "better": "lower"}
+
+
+def compare(results, baseline, tolerance):
+    # Relative change per metric against a saved run; returns the metrics that got worse
+    regressions = []
+    for name, result in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None or not previous["value"]:
+            print(f"{name:60s} {result['value']:12.4f} {result['unit']:6s} (new)")
+            continue
+        change = (result["value"] - previous["value"]) / previous["value"]
+        worse = change > tolerance if result["better"] == "lower" else change < -tolerance
+        print(f"{name:60s} {result['value']:12.4f} {result['unit']:6s} {change:+8.1%}{'  REGRESSION' if worse else ''}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def run(sizes, fixture_directory=FIXTURE_DIRECTORY, seed=0, frames=200, faces_per_frame=4, repeats=20,
+        confidence_threshold=0.7, max_npy=100000, ann=False, video=None, synthetic_video=False, face_image=None):
+    results = {}
+    for size in sizes:
+        npy_directory, gallery_directory = fixture_paths(fixture_directory, size, seed)
+        if size <= max_npy and not os.path.isdir(npy_directory):
+            print(f"Building npy_data fixture with {size} encodings", file=sys.stderr)
+            build_npy_fixture(npy_directory, size, seed)
+        if not os.path.isdir(gallery_directory):
+            print(f"Building gallery fixture with {size} encodings", file=sys.stderr)
+            build_gallery_fixture(gallery_directory, size, seed)
+
+        print(f"Benchmarking n={size}", file=sys.stderr)
+        gallery = benchmark_gallery_load(results, size, npy_directory, gallery_directory, max_npy)
+        benchmark_matching(results, size, gallery, frames, faces_per_frame, confidence_threshold, ann, seed)
+        benchmark_operations(results, size, gallery_directory, repeats, seed)
+
+        video_path = video
+        if video_path is None and synthetic_video:
+            video_path = os.path.join(fixture_directory, f"synthetic_seed{seed}.avi")
+            if not os.path.exists(video_path):
+                make_synthetic_video(video_path, face_image=face_image, seed=seed)
+        if video_path is not None:
+            benchmark_end_to_end(results, size, gallery, video_path, confidence_threshold)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for gallery load, matching, registration and end-to-end FPS.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="gallery sizes in encodings (up to 1000000)")
+    parser.add_argument("--fixtures", default=FIXTURE_DIRECTORY, help="where generated galleries and videos are cached")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=200, help="frames per matching benchmark")
+    parser.add_argument("--faces", type=int, default=4, help="faces per frame in the matching benchmark")
+    parser.add_argument("--repeats", type=int, default=20, help="register/edit/delete repetitions")
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--max-npy", type=int, default=100000, help="skip the one-file-per-sample layout above this size")
+    parser.add_argument("--ann", action="store_true", help="also benchmark matching through an IVF index")
+    parser.add_argument("--video", default=None, help="recorded video for the end-to-end benchmark")
+    parser.add_argument("--synthetic-video", action="store_true", help="generate a video fixture for the end-to-end benchmark")
+    parser.add_argument("--face-image", default=None, help="photo pasted into the synthetic video")
+    parser.add_argument("--output", default=None, help="write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="baseline JSON from an earlier --output")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="relative slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.fixtures, args.seed, args.frames, args.faces, args.repeats, args.threshold,
+                  args.max_npy, args.ann, args.video, args.synthetic_video, args.face_image)
+    report = {"machine": {"platform": platform.platform(), "python": platform.python_version(), "numpy": np.__version__,
+                          "cpus": os.cpu_count()},
+              "settings": vars(args), "results": results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metrics regressed by more than {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+    elif not args.output:
+        json.dump(report, sys.stdout, indent=2)
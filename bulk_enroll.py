@@ -0,0 +1,179 @@
+# Standard libraries
+import os  # Operating system functions
+import re  # Regular expressions
+import csv  # CSV file handling
+import json  # Resumable progress log
+import argparse  # Command line parsing
+import multiprocessing  # Process pool for detection and encoding
+
+# Third-party libraries
+import face_recognition  # Face recognition library
+
+# Local modules
+from gallery import GALLERY_DIRECTORY, load_gallery  # Packed, memory-mapped face gallery
+from ann_index import refresh_index  # Keep the optional ANN index in step
+from validation import validate_student  # Same name/roll rules as register_new_student
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+STUDENT_NAME_PATTERN = re.compile(r"^(?P<name>[^_]+)_(?P<roll_no>[^_]+)(_.*)?$")
+
+
+def find_images(source):
+    # (roll_no, name, image_path) triples from a manifest CSV (Roll No, Name, Image columns)
+    # or a directory of "Name_Roll/" folders and/or "Name_Roll[_anything].jpg" files
+    if os.path.isfile(source):
+        base = os.path.dirname(os.path.abspath(source))
+        with open(source, newline='') as f:
+            for record in csv.DictReader(f):
+                yield record["Roll No"].strip(), record["Name"].strip(), os.path.join(base, record["Image"].strip())
+        return
+
+    for entry in sorted(os.listdir(source)):
+        path = os.path.join(source, entry)
+        stem = os.path.splitext(entry)[0] if os.path.isfile(path) else entry
+        match = STUDENT_NAME_PATTERN.match(stem)
+        if match is None:
+            continue
+        if os.path.isdir(path):
+            for image in sorted(os.listdir(path)):
+                if image.lower().endswith(IMAGE_EXTENSIONS):
+                    yield match["roll_no"], match["name"], os.path.join(path, image)
+        elif entry.lower().endswith(IMAGE_EXTENSIONS):
+            yield match["roll_no"], match["name"], path
+
+
+def encode_image(job):
+    # Worker: detect once and encode the face if there is exactly one
+    roll_no, name, path = job
+    try:
+        image = face_recognition.load_image_file(path)  # Already RGB
+    except (OSError, ValueError) as error:
+        return {"path": path, "roll_no": roll_no, "name": name, "status": "unreadable", "detail": str(error)}
+    face_locations = face_recognition.face_locations(image)
+    if len(face_locations) != 1:
+        status = "no_face" if not face_locations else "multiple_faces"
+        return {"path": path, "roll_no": roll_no, "name": name, "status": status, "detail": f"{len(face_locations)} faces"}
+    encoding = face_recognition.face_encodings(image, face_locations)[0]
+    return {"path": path, "roll_no": roll_no, "name": name, "status": "ok", "encoding": [float(v) for v in encoding]}
+
+
+def load_progress(state_path):
+    # Results already computed by an earlier run, keyed by image path, plus the first gallery
+    # row of a gallery write it had started (or None) and its commit flag. A torn last line
+    # is cut off so this run's records start on a fresh line
+    done = {}
+    gallery_write = None
+    committed = False
+    if os.path.exists(state_path):
+        valid_bytes = 0
+        with open(state_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Torn last line from an interrupted run; that image is redone
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                valid_bytes += len(line)
+                if record.get("committed"):
+                    committed = True
+                elif "gallery_write" in record:
+                    gallery_write = record["gallery_write"]
+                else:
+                    done[record["path"]] = record
+        if valid_bytes != os.path.getsize(state_path):
+            with open(state_path, 'r+b') as f:
+                f.truncate(valid_bytes)
+    return done, gallery_write, committed
+
+
+def log_record(state, record):
+    # One complete line per record, on disk before the next one is written
+    state.write(json.dumps(record) + "\n")
+    state.flush()
+
+
+def bulk_enroll(source, state_path, report_path, workers=None, append=False, gallery_directory=GALLERY_DIRECTORY):
+    done, gallery_write, committed = load_progress(state_path)
+    if committed:
+        print(f"{state_path} records a finished import; delete it to run again")
+        return done
+
+    gallery = load_gallery(gallery_directory)
+    results = dict(done)
+    jobs = []
+    for roll_no, name, path in find_images(source):
+        if path in results:
+            continue
+        error = validate_student(name, roll_no)
+        if error:
+            results[path] = {"path": path, "roll_no": roll_no, "name": name, "status": "invalid", "detail": error}
+        elif gallery.has_student(roll_no) and not append:
+            results[path] = {"path": path, "roll_no": roll_no, "name": name, "status": "already_enrolled", "detail": ""}
+        else:
+            jobs.append((roll_no, name, path))
+    print(f"{len(done)} images already processed, {len(jobs)} to go")
+
+    # Fan detection and encoding out across every core; each result is logged as it arrives
+    # so an interrupted import picks up where it stopped
+    with open(state_path, 'a') as state, multiprocessing.get_context("spawn").Pool(workers) as pool:
+        for i, result in enumerate(pool.imap_unordered(encode_image, jobs, chunksize=8), 1):
+            results[result["path"]] = result
+            log_record(state, result)
+            if i % 100 == 0:
+                print(f"{i}/{len(jobs)} images encoded")
+
+    # One batch write into the gallery for every student with at least one usable image
+    students = {}
+    for result in results.values():
+        if result["status"] == "ok":
+            students.setdefault(result["roll_no"], (result["name"], []))[1].append(result["encoding"])
+
+    added = 0
+    if gallery_write is not None and written_by_interrupted_run(gallery, gallery_write, students):
+        # An earlier run got as far as its registry commit but not its commit line
+        print("The gallery write of the interrupted run had completed; not enrolling again")
+        students = {}
+    else:
+        if not append:
+            students = {roll_no: student for roll_no, student in students.items() if not gallery.has_student(roll_no)}
+        with open(state_path, 'a') as state:
+            log_record(state, {"gallery_write": len(gallery.rows)})
+        added = gallery.add_students([(name, roll_no, encodings) for roll_no, (name, encodings) in students.items()])
+    refresh_index(gallery, gallery_directory)
+    with open(state_path, 'a') as state:
+        log_record(state, {"committed": True})
+
+    write_report(results.values(), report_path)
+    print(f"Enrolled {len(students)} students ({added} samples); report written to {report_path}")
+    return results
+
+
+def written_by_interrupted_run(gallery, first_row, students):
+    # add_students makes all its rows live in one registry commit, so any live row from
+    # first_row on that belongs to this import means the whole write went through
+    live = gallery.live_rows()
+    return any(gallery.rows[row][0] in students for row in live[live >= first_row])
+
+
+def write_report(results, report_path):
+    # Every image that was not enrolled, and why
+    with open(report_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Image", "Roll No", "Name", "Status", "Detail"])
+        for result in sorted(results, key=lambda r: r["path"]):
+            if result["status"] != "ok":
+                writer.writerow([result["path"], result["roll_no"], result["name"], result["status"], result.get("detail", "")])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enroll students in bulk from a photo directory or manifest CSV.")
+    parser.add_argument("source", help="directory of Name_Roll folders/files, or a CSV with Roll No, Name, Image columns")
+    parser.add_argument("--state", default="bulk_enroll_state.jsonl", help="progress log used to resume an interrupted import")
+    parser.add_argument("--report", default="bulk_enroll_report.csv", help="CSV of images with zero or multiple faces, etc.")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--append", action="store_true", help="add samples to students who are already enrolled")
+    parser.add_argument("--gallery-dir", default=GALLERY_DIRECTORY)
+    args = parser.parse_args()
+
+    bulk_enroll(args.source, args.state, args.report, args.workers, args.append, args.gallery_dir)
@@ -0,0 +1,91 @@
+# Standard libraries
+import os  # Operating system functions
+import json  # Saved matcher settings
+import time  # Timing for the accuracy report
+import argparse  # Command line parsing
+
+# Third-party libraries
+import numpy as np  # NumPy for numerical operations
+
+# Local modules
+from gallery import GALLERY_DIRECTORY, ENCODING_SIZE, load_gallery  # Packed face gallery
+from matcher import FaceMatcher, PRECISIONS, decision_changes  # Vectorized face matcher
+
+SETTINGS_FILE = "matcher.json"
+DEFAULT_SETTINGS = {"precision": "float32", "centroid_tier": 0}
+
+
+def load_settings(gallery_directory=GALLERY_DIRECTORY):
+    # Matcher options for this gallery; the full-precision defaults unless compact mode was enabled
+    path = os.path.join(gallery_directory, SETTINGS_FILE)
+    if not os.path.exists(path):
+        return dict(DEFAULT_SETTINGS)
+    with open(path) as f:
+        return {**DEFAULT_SETTINGS, **json.load(f)}
+
+
+def save_settings(settings, gallery_directory=GALLERY_DIRECTORY):
+    path = os.path.join(gallery_directory, SETTINGS_FILE)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(settings, f)
+    os.replace(path + ".tmp", path)
+
+
+def evaluation_queries(gallery, noise=0.03, stranger_rate=0.2, max_queries=2000, seed=0):
+    # Noisy copies of enrolled samples plus a share of shuffled-dimension "strangers", so both
+    # accept and reject decisions near the threshold are exercised
+    rng = np.random.default_rng(seed)
+    live = gallery.live_rows()
+    picked = rng.choice(live, min(max_queries, len(live)), replace=False)
+    queries = np.asarray(gallery.encodings[picked], dtype=np.float32)
+    queries += rng.normal(0, noise, queries.shape).astype(np.float32)
+    strangers = rng.random(len(queries)) < stranger_rate
+    queries[strangers] = rng.permuted(queries[strangers], axis=1)
+    return queries
+
+
+def accuracy_report(gallery, configurations, confidence_threshold=0.7, noise=0.03, max_queries=2000, seed=0):
+    # Decision changes, memory and speed of each (precision, centroid_tier) against full precision
+    queries = evaluation_queries(gallery, noise, max_queries=max_queries, seed=seed)
+    reference = FaceMatcher.from_gallery(gallery)
+    report = []
+    for precision, centroid_tier in configurations:
+        matcher = FaceMatcher.from_gallery(gallery, precision=precision, centroid_tier=centroid_tier)
+        start = time.perf_counter()
+        matcher.identify(queries, confidence_threshold)
+        elapsed = time.perf_counter() - start
+        changes = decision_changes(reference, matcher, queries, confidence_threshold)
+        report.append({"precision": precision, "centroid_tier": centroid_tier, "gallery_bytes": matcher.gallery.nbytes,
+                       "ms_per_face": elapsed * 1000 / max(len(queries), 1), **changes})
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate or enable the compact (float16/int8, centroid-tier) matcher.")
+    parser.add_argument("--gallery-dir", default=GALLERY_DIRECTORY)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--noise", type=float, default=0.03, help="per-dimension noise added to evaluation queries")
+    parser.add_argument("--tiers", type=int, nargs="+", default=[0, 8, 32], help="centroid tier sizes to evaluate (0 = off)")
+    parser.add_argument("--enable", choices=PRECISIONS, default=None, help="save this precision as the gallery's matcher setting")
+    parser.add_argument("--centroid-tier", type=int, default=0, help="centroid tier saved with --enable")
+    parser.add_argument("--max-changes", type=int, default=0, help="refuse --enable if more decisions than this change")
+    args = parser.parse_args()
+
+    gallery = load_gallery(args.gallery_dir)
+    if args.enable:
+        configurations = [(args.enable, args.centroid_tier)]
+    else:
+        configurations = [(precision, tier) for precision in PRECISIONS for tier in args.tiers]
+
+    report = accuracy_report(gallery, configurations, args.threshold, args.noise)
+    print(f"{report[0]['faces']} queries, {report[0]['accepted']} accepted at full precision ({len(gallery.live_rows())} samples of {ENCODING_SIZE} dims)")
+    for row in report:
+        print(f"{row['precision']:8s} tier {row['centroid_tier']:4d}: {row['gallery_bytes'] / 2**20:8.1f} MiB  {row['ms_per_face']:.3f} ms/face  "
+              f"{row['changed']} changed decisions ({row['newly_rejected']} rejected, {row['newly_accepted']} accepted, "
+              f"{row['different_student']} other student)  max confidence shift {row['max_confidence_shift']:.4f}")
+
+    if args.enable:
+        if report[0]["changed"] > args.max_changes:
+            parser.exit(1, f"Not enabled: {report[0]['changed']} decisions changed (limit {args.max_changes})\n")
+        save_settings({"precision": args.enable, "centroid_tier": args.centroid_tier}, args.gallery_dir)
+        print(f"Saved {SETTINGS_FILE} in {args.gallery_dir}")
@@ -0,0 +1,108 @@
+# Standard libraries
+import os  # Operating system functions
+
+# Third-party libraries
+import cv2  # OpenCV for computer vision tasks
+import face_recognition  # Face recognition library
+
+DETECTOR_BACKENDS = ("hog", "cnn", "haar", "lbp", "dnn")
+HAAR_CASCADE = "haarcascade_frontalface_default.xml"
+LBP_CASCADE = "lbpcascade_frontalface_improved.xml"
+
+
+class FaceDetector:
+    """Face detector that runs on a downscaled copy of the frame.
+
+    prepare() converts the camera's BGR frame to RGB once; detect() shrinks that RGB frame
+    by `scale`, runs the chosen backend and maps the boxes back to full resolution so the
+    encoder sees the full-resolution face. Boxes use face_recognition's (top, right,
+    bottom, left) order whatever the backend.
+
+    Backends:
+        hog  - dlib HOG (face_recognition's default), upsampled `upsample` times
+        cnn  - dlib CNN, upsampled `upsample` times (only sensible with a GPU build of dlib)
+        haar - OpenCV's bundled Haar frontal face cascade
+        lbp  - OpenCV LBP cascade; pass cascade_path when the build does not ship lbpcascades
+        dnn  - OpenCV's YuNet DNN detector (cv2.FaceDetectorYN); pass the ONNX model as model_path
+    """
+
+    def __init__(self, backend="hog", scale=0.5, upsample=1, min_face_size=20,
+                 cascade_path=None, model_path=None, score_threshold=0.8):
+        if backend not in DETECTOR_BACKENDS:
+            raise ValueError(f"Unknown detector backend: {backend}")
+        if not 0 < scale <= 1:
+            raise ValueError("Detection scale must be in (0, 1]")
+        self.backend = backend
+        self.scale = scale
+        self.upsample = upsample
+        self.min_face_size = min_face_size
+        self.score_threshold = score_threshold
+
+        self.cascade = None
+        self.dnn = None
+        if backend in ("haar", "lbp"):
+            self.cascade = cv2.CascadeClassifier(cascade_path or default_cascade_path(backend))
+            if self.cascade.empty():
+                raise FileNotFoundError(f"Could not load {backend} cascade from {cascade_path or default_cascade_path(backend)}")
+        elif backend == "dnn":
+            if not model_path or not os.path.exists(model_path):
+                raise FileNotFoundError("The dnn backend needs model_path pointing at a YuNet .onnx model")
+            self.dnn = cv2.FaceDetectorYN.create(model_path, "", (320, 320), score_threshold)
+
+    @staticmethod
+    def prepare(frame):
+        # Convert the camera's BGR frame to the RGB order dlib expects, once per frame
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def detect(self, rgb_frame):
+        # Face locations in full-resolution (top, right, bottom, left) coordinates
+        if self.scale < 1:
+            small = cv2.resize(rgb_frame, (0, 0), fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        else:
+            small = rgb_frame
+
+        if self.backend in ("hog", "cnn"):
+            boxes = face_recognition.face_locations(small, number_of_times_to_upsample=self.upsample, model=self.backend)
+        elif self.backend in ("haar", "lbp"):
+            boxes = self._detect_cascade(small)
+        else:
+            boxes = self._detect_dnn(small)
+        return self._to_full_resolution(boxes, rgb_frame.shape)
+
+    def _detect_cascade(self, small):
+        gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+        min_size = max(1, int(self.min_face_size * self.scale))
+        rects = self.cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_size, min_size))
+        return [(y, x + w, y + h, x) for (x, y, w, h) in rects]
+
+    def _detect_dnn(self, small):
+        height, width = small.shape[:2]
+        self.dnn.setInputSize((width, height))
+        # YuNet expects BGR input
+        _, faces = self.dnn.detect(cv2.cvtColor(small, cv2.COLOR_RGB2BGR))
+        if faces is None:
+            return []
+        return [(int(y), int(x + w), int(y + h), int(x)) for x, y, w, h in faces[:, :4]]
+
+    def _to_full_resolution(self, boxes, shape):
+        height, width = shape[:2]
+        full = []
+        for top, right, bottom, left in boxes:
+            top, right, bottom, left = (int(round(v / self.scale)) for v in (top, right, bottom, left))
+            full.append((max(0, top), min(width, right), min(height, bottom), max(0, left)))
+        return full
+
+
+def default_cascade_path(backend):
+    # OpenCV's pip wheels ship the Haar cascades; LBP cascades sit next to them in source builds
+    haar_directory = cv2.data.haarcascades
+    if backend == "haar":
+        return os.path.join(haar_directory, HAAR_CASCADE)
+    return os.path.join(os.path.dirname(os.path.normpath(haar_directory)), "lbpcascades", LBP_CASCADE)
+
+
+def encode_faces(rgb_frame, face_locations):
+    # 128-d encodings for full-resolution face locations in an RGB frame
+    if not face_locations:
+        return []
+    return face_recognition.face_encodings(rgb_frame, face_locations)
@@ -1,19 +1,21 @@
 # Standard libraries
 import os  # Operating system functions
-import re  # Regular expressions
+import sys  # Platform check for opening files
+import queue  # Events from the background workers to the GUI
+import subprocess  # Open the attendance CSV outside Windows
 
-# Third-party libraries
-import cv2  # OpenCV for computer vision tasks
-import csv  # CSV file handling
-import numpy as np  # NumPy for numerical operations
-import face_recognition  # Face recognition library
+# Local modules (standard library only; OpenCV, dlib and NumPy load on the warm-up thread)
+from warmup import Preloader  # Background imports, gallery and matcher kept warm
+from attendance import AttendanceStore, monthly_csv_path  # Attendance database and monthly CSV files
+from session import PREVIEW_WIDTH, AttendanceSession, RegistrationJob  # Recognition and registration off the Tk thread
+from validation import validate_name, validate_roll_no, validate_student  # Name and roll number rules
 
 # Python's built-in libraries
-from datetime import datetime, timedelta  # Date and time handling
 from pathlib import Path  # Path manipulation
 from tkinter import Frame, Label, Tk, Canvas, Button, PhotoImage, Text, Toplevel, messagebox, Entry # GUI library
 
 ASSETS_PATH = Path("build/assets")
+POLL_INTERVAL = 30  # Milliseconds between checks of the worker event queue
 
 def relative_to_assets(frame_directory: str, path: str) -> Path:
     result = ASSETS_PATH / frame_directory / path
@@ -35,7 +37,22 @@ class AttendanceSystemGUI:
         self.edit_window = None
         self.delete_window = None
 
-        self.last_attendance_time = {}
+        # Background workers report through this queue; poll_events drains it on the Tk thread
+        self.events = queue.Queue()
+        self.session = None
+        self.session_window = None
+        self.session_label = None
+        self.registration = None
+        self.registration_window = None
+        self.registration_label = None
+        self.preview_source = None  # Worker whose latest frame is shown in the preview window
+        self.preview_label = None
+        self.preview_image = None
+        self.last_marked = ""
+
+        # Start loading the recognition stack while the operator logs in
+        self.preloader = Preloader().start()
+        self.attendance_log = AttendanceStore()  # Batched attendance writer with persistent 24 hour dedup
         self.init_assets_path()
         self.show_login()
 
@@ -79,6 +96,7 @@ class AttendanceSystemGUI:
         "Facial Recognition\n       Attendance System", fill="#1D6920", font=("Pricedown", 70 * -1))
 
         self.login_window.resizable(False, False)
+        self.login_window.after_idle(self.preloader.mark, "login window shown")
         self.login_window.mainloop()
 
     def verify_login(self):
@@ -96,101 +114,90 @@ class AttendanceSystemGUI:
             self.username_entry.delete(0, 'end')
             self.password_entry.delete(0, 'end')
 
-    def take_attendance(self, confidence_threshold=0.7):
-        # Define the interval for marking attendance (24 hours)
-        attendance_interval = timedelta(hours=24)
-
-        # Initialize lists to store known face encodings and corresponding names
-        known_face_encodings = []
-        known_face_names = []
-
-        # Loop through npy files in the npy_data directory to load known face encodings
-        for file in os.listdir('npy_data'):
-            if file.endswith('.npy'):
-                known_face_encodings.append(np.load(os.path.join('npy_data', file)))
-                parts = file[:-4].split('_')
-                if len(parts) == 3:
-                    name, roll_no, _ = parts
-                    known_face_names.append((name, roll_no))
-
-        # Start video capture
-        video_capture = cv2.VideoCapture(1)
+    def take_attendance(self, confidence_threshold=0.7, detector=None, scheduler=None, metrics_path="csv_data/metrics.json", metrics_interval=10.0):
+        # Toggle: a second click stops the running session
+        if self.session is not None:
+            self.stop_attendance()
+            return
+        if self.registration is not None:
+            messagebox.showerror("Error", "Please wait for the registration to finish.")
+            return
 
+        # Recognition runs on a background worker; this window only shows what it reports
+        self.session_window, self.preview_label, self.session_label = self.create_preview_window("Attendance", self.stop_attendance)
+        Button(self.session_window, text="Stop Session", command=self.stop_attendance, font=("Youtube Sans", 17),
+               relief="flat", bg="#1D6920", fg="#D3D3D3").pack(pady=10)
+        self.session = AttendanceSession(self.preloader, self.attendance_log, self.events, confidence_threshold,
+                                         detector=detector, scheduler=scheduler, metrics_path=metrics_path,
+                                         metrics_interval=metrics_interval).start()
+        self.preview_source = self.session
+
+    def stop_attendance(self):
+        # The worker releases the camera and reports "stopped"; the window closes then
+        if self.session is not None:
+            self.session.stop()
+            self.session_label.config(text="Stopping...")
+
+    def create_preview_window(self, title, on_close):
+        window = Toplevel(self.window)
+        window.title(title)
+        window.configure(bg="#F8C400")
+        window.protocol("WM_DELETE_WINDOW", on_close)
+        preview_label = Label(window, text="Waiting for the camera...", bg="#000000", fg="#F8C400", font=("Youtube Sans", 17),
+                              width=PREVIEW_WIDTH // 12, height=PREVIEW_WIDTH // 24)  # In characters until a frame arrives
+        preview_label.pack(padx=10, pady=10)
+        status_label = Label(window, text="Starting...", bg="#F8C400", font=("Youtube Sans", 17))
+        status_label.pack()
+        return window, preview_label, status_label
+
+    def poll_events(self):
+        # Runs on the Tk thread every POLL_INTERVAL ms; workers never touch widgets themselves
         while True:
-            ret, frame = video_capture.read()
-
-            # Detect face locations and encode them
-            face_locations = face_recognition.face_locations(frame)
-            face_encodings = face_recognition.face_encodings(frame, face_locations)
-
-            for (top, right, bottom, left), face_encoding in zip(face_locations, face_encodings):
-                # Calculate face distance (confidence level) between detected face and known faces
-                face_distances = face_recognition.face_distance(known_face_encodings, face_encoding)
-                best_match_index = np.argmin(face_distances)
-                confidence = 1 - face_distances[best_match_index]
-
-                if confidence >= confidence_threshold:
-                    # Get the matched student's name and roll number
-                    name, roll_no = known_face_names[best_match_index]
-                else:
-                    # Confidence is not high enough, mark as "UNKNOWN N/A"
-                    name = "UNKNOWN"
-                    roll_no = "N/A"
-
-                # Draw a Golden rectangle around the face
-                cv2.rectangle(frame, (left, top), (right, bottom), (0, 165, 255), 2)  # Golden rectangle around the face
-                cv2.putText(frame, f"{name}-{roll_no}", (left, bottom + 20), cv2.FONT_HERSHEY_DUPLEX, 1.0,
-                            (0, 165, 255), 2)
-                # Calculate text size and position
-                text = "Press Q to stop Taking Attendance"
-                text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_DUPLEX, 1.0, 2)[0]
-                text_x = (frame.shape[1] - text_size[0]) // 2  # Center horizontally
-                text_y = frame.shape[0] - 20  # Bottom of the frame, leaving a small gap
-
-                # Draw the text
-                cv2.putText(frame, text, (text_x, text_y), cv2.FONT_HERSHEY_DUPLEX, 1.0, (56, 195, 255), 2)
-
-                if name != "UNKNOWN":
-                    # Get the last marked attendance time for the student
-                    last_marked_time = self.last_attendance_time.get(name, datetime.min)
-                    time_diff = datetime.now() - last_marked_time
-
-                    if time_diff >= attendance_interval:
-                        # Mark attendance if the time interval is reached
-                        self.last_attendance_time[name] = datetime.now()
-
-                        now = datetime.now()
-                        month_name = now.strftime('%B')
-                        year_name = now.strftime('%Y')
-                        file_name = os.path.join('csv_data', f"{month_name}_{year_name}.csv")
-
-                        header_exists = os.path.exists(file_name)
-                        with open(file_name, 'a', newline='') as f:
-                            writer = csv.writer(f)
-                            if not header_exists:
-                                writer.writerow(["Roll No", "Date", "Name"])  # Header row with columns reordered
-                            writer.writerow([roll_no, now.strftime('%d-%m-%Y'), name])
-                            print("\n\nAttendance Marked", f"\n\nRecord added to {file_name}: {roll_no}, {now.strftime('%d-%m-%Y')}, {name}\n")
-
-            # Display the frame with detected faces
-            cv2.imshow('Attendance', frame)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
                 break
-
-        # Release video capture and close the OpenCV windows
-        video_capture.release()
-        cv2.destroyAllWindows()
+            self.handle_event(kind, payload)
+
+        if self.preview_source is not None and self.preview_source.preview is not None:
+            # Keep a reference, or Tk discards the image before it is drawn
+            self.preview_image = PhotoImage(master=self.window, data=self.preview_source.preview, format="PPM")
+            self.preview_source.preview = None
+            self.preview_label.config(image=self.preview_image, width=self.preview_image.width(), height=self.preview_image.height())  # Pixels once an image is set
+
+        self.window.after(POLL_INTERVAL, self.poll_events)
+
+    def handle_event(self, kind, payload):
+        if kind == "stats":
+            text = f"Recognised today: {payload['recognised_today']}    Unknowns: {payload['unknowns']}    FPS: {payload['fps']:.1f}"
+            self.session_label.config(text=text)
+            self.status_label.config(text=f"{text}    {self.last_marked}")
+        elif kind == "status":
+            label = self.session_label if self.session is not None else self.registration_label
+            if label is not None:
+                label.config(text=payload)
+        elif kind == "marked":
+            name, roll_no = payload
+            self.last_marked = f"Last marked: {name} {roll_no}"
+        elif kind == "error":
+            messagebox.showerror("Error", payload)
+        elif kind == "stopped":
+            self.session = None
+            self.preview_source = None
+            self.session_window.destroy()
+            self.status_label.config(text="Attendance session stopped.")
+        elif kind == "registration":
+            self.finish_registration(*payload)
 
     def check_attendance(self):
-        now = datetime.now()
-        month_name = now.strftime('%B')
-        year_name = now.strftime('%Y')
-        attendance_file = os.path.join('csv_data', f"{month_name}_{year_name}.csv")
-        
+        attendance_file = monthly_csv_path()
+
         if os.path.exists(attendance_file):
-            # Open the attendance CSV file if it exists
-            os.startfile(attendance_file)
-        pass
+            # Open the attendance CSV file if it exists, with the platform's default application
+            if sys.platform == "win32":
+                os.startfile(attendance_file)
+            else:
+                subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", attendance_file])
 
     def main_menu(self):
         self.window = Tk()  # Assign the main menu window to self.window
@@ -243,7 +250,14 @@ class AttendanceSystemGUI:
         text_label = Label(text="Main Menu", bg="#F8C400", font=("Pricedown", 40))
         text_label.place(x=420, y=370)
 
+        # Live counters from the attendance worker; the menu stays usable while it runs
+        self.status_label = Label(text="", anchor="w", bg="#F8C400", font=("Youtube Sans", 17))
+        self.status_label.place(x=60, y=700, width=960, height=35)
+        self.window.after(POLL_INTERVAL, self.poll_events)
+
         self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.close_main_window)
+        self.window.after_idle(self.preloader.mark, "main menu shown")
         self.window.mainloop()
 
     def register_new_student(self, name_entry, roll_no_entry):
@@ -251,59 +265,34 @@ class AttendanceSystemGUI:
         name = name_entry.get("1.0", "end-1c")
         roll_no = roll_no_entry.get("1.0", "end-1c")
 
-        # Validate user input against the pattern of no lines and tabs
-        if re.search(r'[\t\n]', name) or re.search(r'[\t\n]', roll_no):
-            messagebox.showerror("Error", "Name and roll number cannot contain tabs or newlines.")
-            self.register_window.destroy()  # Close the window on error
-            return
-        # Validate user input for name
-        if not re.match(r'[A-Za-z ]+$', name):
-            messagebox.showerror("Error", "Name can only contain letters and spaces.")
+        # Validate the name and roll number (shared with bulk enrollment)
+        error = validate_student(name, roll_no)
+        if error:
+            messagebox.showerror("Error", error)
             self.register_window.destroy()  # Close the window on error
             return
-        # Validate user input for roll no
-        if not re.match(r'\d{1,8}$', roll_no):
-            messagebox.showerror("Error", "Roll number must be a number with 1 to 8 digits.")
-            self.register_window.destroy()  # Close the window on error
+        # The camera can only serve one worker at a time
+        if self.session is not None or self.registration is not None:
+            messagebox.showerror("Error", "Please stop the attendance session before registering a student.")
             return
 
         # Display a message to instruct the user to move their head slightly
         messagebox.showinfo("Scan Instructions", "Please get ready to angle your face UP, DOWN, LEFT, RIGHT\nslightly while scanning your face.\n\nThe Scan will start once you click on 'OK'.")
 
-        # Initialize variables
-        num_images_to_capture = 5  # Number of face images to capture
-        face_encodings = []
-        video_capture = cv2.VideoCapture(1)
-
-        # Capture and process multiple frames to get multiple face encodings
-        while len(face_encodings) < num_images_to_capture:
-            ret, frame = video_capture.read()
-
-            # Encode the detected face
-            face_encodings_current_frame = face_recognition.face_encodings(frame)
-
-            if len(face_encodings_current_frame) > 0:
-                # Get face location and draw a bright green rectangle around the face
-                top, right, bottom, left = face_recognition.face_locations(frame)[0]
-                cv2.rectangle(frame, (left, top), (right, bottom), (0, 255, 0), 2)  # Bright Green rectangle around the face
-                cv2.putText(frame, f"{name} - {roll_no}", (left, bottom + 20), cv2.FONT_HERSHEY_DUPLEX, 1.0, (0, 255, 0), 2)
-
-                # Save the face encoding as a numpy file with a unique filename
-                face_encoding_file = os.path.join('npy_data', f"{name}_{roll_no}_{len(face_encodings) + 1}.npy")
-                np.save(face_encoding_file, face_encodings_current_frame[0])
-
-                # Display a success message
-                cv2.imshow('Face Registration', frame)
-                cv2.waitKey(1000)  # Show each frame for the specified interval
-                face_encodings.append(face_encodings_current_frame[0])
-
-        # Release video capture and close the OpenCV windows
-        video_capture.release()
-        cv2.destroyAllWindows()
-
-        messagebox.showinfo("Success", f"Student {name} {roll_no} registered successfully!")
-
-        self.register_window.destroy()  # Close the window after successful registration
+        # Capture, quality ranking, encoding and the duplicate check run on a background worker
+        self.registration_window, self.preview_label, self.registration_label = self.create_preview_window("Face Registration", lambda: None)
+        self.registration = RegistrationJob(self.preloader, name, roll_no, self.events).start()
+        self.preview_source = self.registration
+
+    def finish_registration(self, ok, message):
+        self.registration = None
+        self.preview_source = None
+        self.registration_window.destroy()
+        if ok:
+            messagebox.showinfo("Success", message)
+        else:
+            messagebox.showerror("Error", message)
+        self.register_window.destroy()  # Close the register window whatever the outcome
 
     def create_register_gui(self):
         self.register_window = Toplevel(self.window)
@@ -344,39 +333,16 @@ class AttendanceSystemGUI:
         roll_no = roll_no_entry.get("1.0", "end-1c")  # Get roll number from the Text widget
         new_name = new_name_entry.get("1.0", "end-1c")  # Get new name from the Text widget
 
-        # Validate user input against the pattern of no lines and tabs
-        if re.search(r'[\t\n]', new_name) or re.search(r'[\t\n]', roll_no):
-            messagebox.showerror("Error", "Name and roll number cannot contain tabs or newlines.")
-            self.edit_window.destroy()  # Close the window on error
-            return
-        # Validate user input for new name
-        if not re.match(r'[A-Za-z ]+$', new_name):
-            messagebox.showerror("Error", "New name can only contain letters and spaces.")
-            self.edit_window.destroy()  # Close the window on error
-            return
-        # Validate user input for roll no
-        if not re.match(r'\d{1,8}$', roll_no):
-            messagebox.showerror("Error", "Roll number must be a number with 1 to 8 digits.")
+        # Validate the roll number and the new name
+        error = validate_roll_no(roll_no) or validate_name(new_name)
+        if error:
+            messagebox.showerror("Error", error)
             self.edit_window.destroy()  # Close the window on error
             return
 
-        found_student = False  # Flag to track if a matching student was found
-
-        for file in os.listdir('npy_data'):
-            if file.endswith('.npy'):
-                parts = file[:-4].split('_')
-                if len(parts) == 3:
-                    name, existing_roll_no, num_face_encodings = parts
-                    if existing_roll_no == roll_no:
-                        # Convert num_face_encodings to an integer
-                        num_face_encodings = int(num_face_encodings)
-                        
-                        # Update the number of face encodings
-                        new_num_face_encodings = num_face_encodings + 1
-                        
-                        new_file_name = os.path.join('npy_data', f"{new_name}_{roll_no}_{new_num_face_encodings}.npy")
-                        os.rename(os.path.join('npy_data', file), new_file_name)
-                        found_student = True  # Set the flag to True if a matching student was found
+        # Record the new name in the registry journal; the gallery matrix and manifest are untouched
+        self.preloader.wait()
+        found_student = self.preloader.gallery().rename_student(roll_no, new_name)
 
         if found_student:
             messagebox.showinfo("Information Updated", "Student's information updated successfully.")
@@ -423,27 +389,20 @@ class AttendanceSystemGUI:
     def delete_student_face_data(self, roll_no_entry):
         roll_no = roll_no_entry.get("1.0", "end-1c")  # Get roll number from the Text widget
 
-        # Validate user input against the pattern of no lines and tabs
-        if re.search(r'[\t\n]', roll_no):
-            messagebox.showerror("Error", "Roll number cannot contain tabs or newlines.")
-            self.delete_window.destroy()  # Close the window on error
-            return
-        # Validate user input for roll no
-        if not re.match(r'\d{1,8}$', roll_no):
-            messagebox.showerror("Error", "Roll number must be a number with 1 to 8 digits.")
+        # Validate the roll number
+        error = validate_roll_no(roll_no)
+        if error:
+            messagebox.showerror("Error", error)
             self.delete_window.destroy()  # Close the window on error
             return
 
-        found_student = False  # Flag to track if a matching student was found
+        from ann_index import refresh_index
 
-        for file in os.listdir('npy_data'):
-            if file.endswith('.npy'):
-                parts = file[:-4].split('_')
-                if len(parts) == 3:
-                    _, existing_roll_no, _ = parts
-                    if existing_roll_no == roll_no:
-                        os.remove(os.path.join('npy_data', file))
-                        found_student = True  # Set the flag to True if a matching student was found
+        # Drop the student from the gallery registry
+        self.preloader.wait()
+        gallery = self.preloader.gallery()
+        found_student = gallery.delete_student(roll_no)
+        refresh_index(gallery)
 
         if found_student:
             messagebox.showinfo("Success", "Face data deleted successfully.")
@@ -526,7 +485,19 @@ class AttendanceSystemGUI:
 
         contact_window.resizable(False, False)
 
+    def shut_down(self):
+        if self.session is not None:
+            self.session.stop()
+            self.session.thread.join(timeout=5)  # Let it release the camera and flush its records
+        self.attendance_log.close()  # Commit any queued attendance records
+
+    def close_main_window(self):
+        # Title-bar close: the same clean shutdown as the Exit button
+        self.shut_down()
+        self.window.destroy()
+
     def close_windows(self, exit_window):
+        self.shut_down()
         exit_window.destroy()  # Close the exit window
         self.window.destroy()  # Close the main menu window
 
@@ -0,0 +1,252 @@
+# Standard libraries
+import os  # Operating system functions
+import csv  # CSV file handling
+import argparse  # Command line parsing
+
+# Third-party libraries
+import numpy as np  # NumPy for numerical operations
+
+# Local modules
+from registry import StudentRegistry  # Journaled roll number -> name/rows map
+
+# Python's built-in libraries
+from pathlib import Path  # Path manipulation
+
+GALLERY_DIRECTORY = "gallery_data"
+NPY_DIRECTORY = "npy_data"
+ENCODING_SIZE = 128  # face_recognition produces 128-d encodings
+MANIFEST_HEADER = ["Roll No", "Name", "Sample"]
+
+
+class FaceGallery:
+    """Packed face gallery: one float32 matrix, a CSV manifest of rows and a student registry.
+
+    encodings.f32 holds every sample ever enrolled as a contiguous (rows, 128) float32
+    matrix that is opened with np.memmap. manifest.csv holds one line per matrix row with
+    the roll number, name and sample number it was enrolled under; both files are only
+    ever appended to. The StudentRegistry maps each roll number to its current name and
+    rows and is the source of truth for who is enrolled: rows it does not reference (deleted
+    students, or a registration interrupted before its registry commit) are never matched.
+    """
+
+    def __init__(self, directory=GALLERY_DIRECTORY):
+        self.directory = Path(directory)
+        self.matrix_path = self.directory / "encodings.f32"
+        self.manifest_path = self.directory / "manifest.csv"
+        self.registry = StudentRegistry(self.directory)
+
+        self.rows = []  # One (roll_no, name, sample) entry per matrix row, as enrolled
+        self.encodings = np.empty((0, ENCODING_SIZE), dtype=np.float32)
+        self.version = 0  # Bumped on every change so callers can tell when to refresh
+
+    def exists(self):
+        return self.manifest_path.exists()
+
+    def load(self):
+        self.rows = []
+        deleted_rows = set()
+        if self.manifest_path.exists():
+            valid_bytes = 0
+            with open(self.manifest_path, 'rb') as f:
+                header = f.readline()
+                if header.endswith(b"\n"):
+                    valid_bytes = len(header)
+                for line in f if valid_bytes else ():
+                    record = self._parse_manifest_line(line)
+                    if record is None:
+                        break  # Torn last line from a crash
+                    valid_bytes += len(line)
+                    # Galleries written before the registry existed carry a Deleted column
+                    if len(record) == 4 and record[3] == "1":
+                        deleted_rows.add(len(self.rows))
+                    self.rows.append((record[0], record[1], int(record[2])))
+            # Cut the fragment off so the next append starts on a fresh line
+            if valid_bytes != self.manifest_path.stat().st_size:
+                with open(self.manifest_path, 'r+b') as f:
+                    f.truncate(valid_bytes)
+
+        # A crash between the matrix append and the manifest append leaves rows without an
+        # identity; drop them so the next append lines up with the manifest again
+        expected_size = len(self.rows) * ENCODING_SIZE * 4
+        if self.matrix_path.exists() and self.matrix_path.stat().st_size > expected_size:
+            with open(self.matrix_path, 'r+b') as f:
+                f.truncate(expected_size)
+
+        if self.registry.exists():
+            self.registry.load()
+        elif self.rows:
+            self._bootstrap_registry(deleted_rows)
+
+        self._map_encodings()
+        self.version += 1
+        return self
+
+    @staticmethod
+    def _parse_manifest_line(line):
+        # Fields of one complete manifest line, or None for a partial one
+        if not line.endswith(b"\n"):
+            return None
+        try:
+            record = next(csv.reader([line.decode()]))
+        except (UnicodeDecodeError, StopIteration, csv.Error):
+            return None
+        if len(record) not in (3, 4) or not record[2].isdigit():
+            return None
+        return record
+
+    def _bootstrap_registry(self, deleted_rows):
+        # One-off: build the registry from a manifest written before it existed, where
+        # renames rewrote every row's name and deletes set a per-row tombstone
+        with self.registry.transaction() as transaction:
+            for i, (roll_no, name, _) in enumerate(self.rows):
+                if i not in deleted_rows:
+                    transaction.add_rows(roll_no, name, [i])
+        self.registry.checkpoint()
+
+    def _map_encodings(self):
+        if self.rows:
+            self.encodings = np.memmap(self.matrix_path, dtype=np.float32, mode='r', shape=(len(self.rows), ENCODING_SIZE))
+        else:
+            self.encodings = np.empty((0, ENCODING_SIZE), dtype=np.float32)
+
+    def live_rows(self):
+        # Matrix rows of every enrolled student, in ascending order
+        rows = [row for student in self.registry.students.values() for row in student["rows"]]
+        return np.sort(np.array(rows, dtype=np.int64))
+
+    def live_mask(self):
+        mask = np.zeros(len(self.rows), dtype=bool)
+        mask[self.live_rows()] = True
+        return mask
+
+    def known_faces(self):
+        # Encodings and (name, roll_no) pairs of every live row, in matching order
+        live = self.live_rows()
+        names = [(self.registry.students[self.rows[i][0]]["name"], self.rows[i][0]) for i in live]
+        return self.encodings[live], names
+
+    def has_student(self, roll_no):
+        return roll_no in self.registry
+
+    def student(self, roll_no):
+        # (name, rows) for a roll number, or None; a dict lookup regardless of gallery size
+        record = self.registry.get(roll_no)
+        return None if record is None else (record["name"], record["rows"])
+
+    def add_student(self, name, roll_no, encodings):
+        return self.add_students([(name, roll_no, encodings)])
+
+    def add_students(self, students):
+        # Append (name, roll_no, encodings) for any number of students as one transaction:
+        # matrix first, then manifest, then a single registry commit that makes them all live
+        self.directory.mkdir(parents=True, exist_ok=True)
+        blocks = []
+        new_rows = []
+        next_row = len(self.rows)
+        added = {}
+        for name, roll_no, encodings in students:
+            encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+            if not len(encodings):
+                continue
+            existing = self.registry.get(roll_no)
+            next_sample = added.get(roll_no, max([self.rows[r][2] for r in existing["rows"]], default=0) if existing else 0) + 1
+            rows = list(range(next_row, next_row + len(encodings)))
+            new_rows += [(roll_no, name, next_sample + i) for i in range(len(encodings))]
+            added[roll_no] = next_sample + len(encodings) - 1
+            blocks.append((name, roll_no, rows, encodings))
+            next_row += len(encodings)
+        if not blocks:
+            return 0
+
+        with open(self.matrix_path, 'ab') as f:
+            for _, _, _, encodings in blocks:
+                f.write(encodings.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        header_exists = self.manifest_path.exists() and self.manifest_path.stat().st_size > 0
+        with open(self.manifest_path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if not header_exists:
+                writer.writerow(MANIFEST_HEADER)
+            writer.writerows(new_rows)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.rows.extend(new_rows)
+        with self.registry.transaction() as transaction:
+            for name, roll_no, rows, _ in blocks:
+                transaction.add_rows(roll_no, name, rows)
+
+        self._map_encodings()
+        self.version += 1
+        return len(new_rows)
+
+    def rename_student(self, roll_no, new_name):
+        # One journal append; the matrix and manifest are untouched
+        found_student = self.registry.rename(roll_no, new_name)
+        if found_student:
+            self.version += 1
+        return found_student
+
+    def delete_student(self, roll_no):
+        # One journal append; the student's rows simply stop being referenced
+        found_student = self.registry.delete(roll_no)
+        if found_student:
+            self.version += 1
+        return found_student
+
+
+def parse_npy_filename(file):
+    # Split "Name_Roll_N.npy" into (name, roll_no, sample), or None for anything else
+    if not file.endswith('.npy'):
+        return None
+    parts = file[:-4].split('_')
+    if len(parts) != 3 or not parts[2].isdigit():
+        return None
+    name, roll_no, sample = parts
+    return name, roll_no, int(sample)
+
+
+def migrate_npy_data(npy_directory=NPY_DIRECTORY, gallery_directory=GALLERY_DIRECTORY):
+    gallery = FaceGallery(gallery_directory)
+    if gallery.exists():
+        raise FileExistsError(f"Gallery already exists at {gallery.manifest_path}")
+
+    # Group the per-sample files by roll number so each student is appended in one go
+    students = {}
+    for file in sorted(os.listdir(npy_directory)):
+        parsed = parse_npy_filename(file)
+        if parsed is None:
+            continue
+        name, roll_no, sample = parsed
+        students.setdefault(roll_no, (name, []))[1].append((sample, os.path.join(npy_directory, file)))
+
+    gallery.add_students([(name, roll_no, [np.load(path) for _, path in sorted(samples)])
+                          for roll_no, (name, samples) in students.items()])
+
+    return gallery
+
+
+def load_gallery(gallery_directory=GALLERY_DIRECTORY, npy_directory=NPY_DIRECTORY):
+    # Open the packed gallery, migrating the legacy npy_data layout on first use
+    gallery = FaceGallery(gallery_directory)
+    if not gallery.exists() and os.path.isdir(npy_directory):
+        return migrate_npy_data(npy_directory, gallery_directory)
+    return gallery.load()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the packed face gallery.")
+    parser.add_argument("--migrate", action="store_true", help="convert npy_data/ into the packed gallery")
+    parser.add_argument("--npy-dir", default=NPY_DIRECTORY)
+    parser.add_argument("--gallery-dir", default=GALLERY_DIRECTORY)
+    args = parser.parse_args()
+
+    if args.migrate:
+        gallery = migrate_npy_data(args.npy_dir, args.gallery_dir)
+    else:
+        gallery = FaceGallery(args.gallery_dir).load()
+
+    live = gallery.live_rows()
+    print(f"{len(live)} live samples ({len(gallery.rows) - len(live)} unreferenced) for {len(gallery.registry)} students in {gallery.directory}")
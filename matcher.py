@@ -0,0 +1,322 @@
+# Third-party libraries
+import numpy as np  # NumPy for numerical operations
+
+# Python's built-in libraries
+from collections import namedtuple  # Lightweight result records
+
+UNKNOWN_NAME = "UNKNOWN"
+UNKNOWN_ROLL_NO = "N/A"
+
+# One ranked identity for a detected face. margin is the distance of the best competing
+# student minus this candidate's distance, so the top candidate's margin is positive when
+# it wins clearly and close to zero when two students look alike.
+Candidate = namedtuple("Candidate", ["name", "roll_no", "distance", "confidence", "margin"])
+
+# Array attributes that fully describe a brute-force matcher
+STATE_ARRAYS = ("gallery", "gallery_sq_norms", "row_students", "offsets", "centroids", "centroid_sq_norms", "row_to_student",
+                "quantization_scale", "quantization_zero")
+
+PRECISIONS = ("float32", "float16", "int8")
+BLOCK_ROWS = 8192  # Compact galleries are decoded to float32 this many rows at a time
+
+
+def quantize_int8(encodings):
+    # Per-dimension scalar quantization: encoding ~= zero + scale * code, codes in [-127, 127]
+    low, high = encodings.min(axis=0), encodings.max(axis=0)
+    zero = ((high + low) / 2).astype(np.float32)
+    scale = np.maximum((high - low) / 254, 1e-12).astype(np.float32)
+    codes = np.clip(np.rint((encodings - zero) / scale), -127, 127).astype(np.int8)
+    return codes, scale, zero
+
+
+class FaceMatcher:
+    """Matches every face in a frame against a pre-stacked gallery in one batch.
+
+    Distances are reduced per student either as the minimum over that student's samples
+    ("min", the same decision as the old argmin over individual samples) or as the
+    distance to the student's mean encoding ("centroid"). When an approximate index is
+    given, "min" only scores the gallery rows in the index's shortlist.
+
+    precision="float16" or "int8" keeps the gallery at a half or a quarter of its float32
+    size and decodes it block by block while matching. centroid_tier=N first ranks students
+    by their mean encoding and then scores only the N nearest students' samples.
+    """
+
+    def __init__(self, encodings, names, reduction="min", row_ids=None, index=None, nprobe=None, shortlist=64,
+                 precision="float32", centroid_tier=0):
+        if reduction not in ("min", "centroid"):
+            raise ValueError(f"Unknown reduction: {reduction}")
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision}")
+        self.reduction = reduction
+        self.precision = precision
+        self.centroid_tier = centroid_tier
+
+        # Optional approximate index over gallery rows; row_ids maps each encoding to its gallery row
+        self.index = index
+        self.nprobe = nprobe
+        self.shortlist = shortlist
+
+        # Assign each (name, roll_no) a student index, keyed by roll number
+        self.students = []
+        student_index = {}
+        row_students = []
+        for name, roll_no in names:
+            if roll_no not in student_index:
+                student_index[roll_no] = len(self.students)
+                self.students.append((name, roll_no))
+            row_students.append(student_index[roll_no])
+        row_students = np.asarray(row_students, dtype=np.int64)
+
+        if row_ids is None:
+            row_ids = np.arange(len(row_students))
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        self.row_to_student = np.full(int(row_ids.max()) + 1 if len(row_ids) else 0, -1, dtype=np.int64)
+        self.row_to_student[row_ids] = row_students
+
+        # Sort rows so each student's samples are contiguous, which lets np.minimum.reduceat
+        # collapse the sample axis in one call
+        order = np.argsort(row_students, kind="stable")
+        self.row_students = row_students[order]
+        gallery = np.ascontiguousarray(np.asarray(encodings, dtype=np.float32).reshape(-1, 128)[order])
+        self.offsets = np.flatnonzero(np.r_[True, self.row_students[1:] != self.row_students[:-1]]) if len(order) else np.empty(0, dtype=np.int64)
+
+        # Centroids come from the full-precision samples and stay float32; there is one per student
+        if (reduction == "centroid" or centroid_tier) and len(gallery):
+            counts = np.diff(np.r_[self.offsets, len(gallery)])
+            self.centroids = (np.add.reduceat(gallery, self.offsets, axis=0) / counts[:, None]).astype(np.float32)
+        else:
+            self.centroids = np.empty((0, 128), dtype=np.float32)
+
+        self.quantization_scale = np.empty(0, dtype=np.float32)
+        self.quantization_zero = np.empty(0, dtype=np.float32)
+        if precision == "float16":
+            gallery = gallery.astype(np.float16)
+        elif precision == "int8" and len(gallery):
+            gallery, self.quantization_scale, self.quantization_zero = quantize_int8(gallery)
+        self.gallery = gallery
+
+        # Norms of the stored (possibly rounded) samples, so distances stay self-consistent
+        self.gallery_sq_norms = np.concatenate([np.einsum("ij,ij->i", block, block) for block in self._decoded_blocks()] or [np.empty(0, dtype=np.float32)])
+        self.centroid_sq_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+
+    @classmethod
+    def from_gallery(cls, gallery, reduction="min", index=None, nprobe=None, shortlist=64, precision="float32", centroid_tier=0):
+        encodings, names = gallery.known_faces()
+        return cls(encodings, names, reduction, gallery.live_rows(), index, nprobe, shortlist, precision, centroid_tier)
+
+    def state(self):
+        # Arrays and metadata that rebuild this matcher without re-sorting the gallery
+        arrays = {key: getattr(self, key) for key in STATE_ARRAYS}
+        return arrays, {"reduction": self.reduction, "students": self.students, "precision": self.precision,
+                        "centroid_tier": self.centroid_tier}
+
+    @classmethod
+    def from_state(cls, arrays, metadata):
+        # Rebuild a matcher around existing arrays (e.g. views into shared memory) without copying
+        matcher = cls.__new__(cls)
+        matcher.__dict__.update(arrays)
+        matcher.reduction = metadata["reduction"]
+        matcher.students = metadata["students"]
+        matcher.precision = metadata.get("precision", "float32")
+        matcher.centroid_tier = metadata.get("centroid_tier", 0)
+        matcher.index = None
+        matcher.nprobe = None
+        matcher.shortlist = 64
+        return matcher
+
+    def __len__(self):
+        return len(self.students)
+
+    def subset(self, roll_nos):
+        # View over just these students (e.g. one class roster) that shares this matcher's arrays
+        wanted = set(roll_nos)
+        return MatcherView(self, [i for i, (_, roll_no) in enumerate(self.students) if roll_no in wanted])
+
+    def _student_rows(self, students):
+        # Sorted gallery rows of some students (ascending student indices), and where each
+        # student's samples start within those rows
+        counts = np.r_[self.offsets[1:], len(self.gallery)][students] - self.offsets[students]
+        local_offsets = np.r_[0, np.cumsum(counts)][:-1].astype(np.int64)
+        rows = np.repeat(self.offsets[students] - local_offsets, counts) + np.arange(counts.sum())
+        return rows, local_offsets
+
+    @staticmethod
+    def _euclidean(queries, targets, target_sq_norms):
+        # ||q - t||^2 = ||q||^2 + ||t||^2 - 2 q.t, computed as a single matrix product
+        query_sq_norms = np.einsum("ij,ij->i", queries, queries)
+        squared = query_sq_norms[:, None] + target_sq_norms[None, :] - 2.0 * (queries @ targets.T)
+        return np.sqrt(np.maximum(squared, 0.0))
+
+    def _decode(self, rows):
+        # float32 copy of some stored gallery rows (a slice or an index array)
+        if self.precision == "int8":
+            return self.quantization_zero + self.quantization_scale * self.gallery[rows].astype(np.float32)
+        return np.asarray(self.gallery[rows], dtype=np.float32)
+
+    def _decoded_blocks(self):
+        for start in range(0, len(self.gallery), BLOCK_ROWS):
+            yield self._decode(slice(start, start + BLOCK_ROWS))
+
+    def distance_matrix(self, face_encodings):
+        # (faces, gallery rows) distances in sorted gallery order
+        queries = np.asarray(face_encodings, dtype=np.float32).reshape(-1, 128)
+        if self.precision == "float32":
+            return self._euclidean(queries, self.gallery, self.gallery_sq_norms)
+        # Decode a cache-sized block at a time so the float32 copy never exists in full
+        distances = np.empty((len(queries), len(self.gallery)), dtype=np.float32)
+        for start, block in zip(range(0, len(self.gallery), BLOCK_ROWS), self._decoded_blocks()):
+            distances[:, start:start + len(block)] = self._euclidean(queries, block, self.gallery_sq_norms[start:start + len(block)])
+        return distances
+
+    def student_distances(self, face_encodings):
+        # (faces, students) distances after reducing over each student's samples
+        queries = np.asarray(face_encodings, dtype=np.float32).reshape(-1, 128)
+        if not self.students or not len(queries):
+            return np.empty((len(queries), len(self.students)), dtype=np.float32)
+        if self.reduction == "centroid":
+            return self._euclidean(queries, self.centroids, self.centroid_sq_norms)
+        if self.index is not None:
+            return self._approximate_student_distances(queries)
+        if self.centroid_tier and self.centroid_tier < len(self.students):
+            return self._tiered_student_distances(queries)
+        return np.minimum.reduceat(self.distance_matrix(queries), self.offsets, axis=1)
+
+    def _tiered_student_distances(self, queries, students=None):
+        # Rank students by centroid, then take the exact minimum over the samples of the
+        # centroid_tier nearest ones; everyone else is left at infinity. students restricts
+        # the ranking to some student indices, which then index the result's columns
+        if students is None:
+            centroid_distances = self._euclidean(queries, self.centroids, self.centroid_sq_norms)
+            students = np.arange(len(self.students))
+        else:
+            centroid_distances = self._euclidean(queries, self.centroids[students], self.centroid_sq_norms[students])
+        nearest = np.argpartition(centroid_distances, self.centroid_tier - 1, axis=1)[:, :self.centroid_tier]
+
+        result = np.full((len(queries), len(students)), np.inf, dtype=np.float32)
+        for face, columns in enumerate(nearest):
+            columns = np.sort(columns)
+            rows, local_offsets = self._student_rows(students[columns])
+            distances = self._euclidean(queries[face:face + 1], self._decode(rows), self.gallery_sq_norms[rows])
+            result[face, columns] = np.minimum.reduceat(distances, local_offsets, axis=1)[0]
+        return result
+
+    def _approximate_student_distances(self, queries):
+        # Scatter the index shortlist into a (faces, students) matrix; students outside the
+        # shortlist are left at infinity and can never be accepted
+        rows, distances = self.index.search(queries, self.shortlist, self.nprobe)
+        known = (rows >= 0) & (rows < len(self.row_to_student))
+        students = np.full(rows.shape, -1, dtype=np.int64)
+        students[known] = self.row_to_student[rows[known]]
+        valid = students >= 0
+
+        faces = np.broadcast_to(np.arange(len(queries))[:, None], rows.shape)
+        result = np.full((len(queries), len(self.students)), np.inf, dtype=np.float32)
+        np.minimum.at(result, (faces[valid], students[valid]), distances[valid])
+        return result
+
+    def match(self, face_encodings, k=3):
+        # Top-k candidate students for every face, best first
+        distances = self.student_distances(face_encodings)
+        return self._rank(distances, np.arange(len(self.students)), k)
+
+    def _rank(self, distances, student_ids, k):
+        # Turn (faces, columns) distances into sorted Candidate lists; student_ids maps columns to students
+        k = min(k, distances.shape[1])
+        if k == 0:
+            return [[] for _ in range(len(distances))]
+
+        # Always rank at least two students so the top candidate gets a margin
+        depth = min(max(k, 2), distances.shape[1])
+        if depth < distances.shape[1]:
+            top = np.argpartition(distances, depth - 1, axis=1)[:, :depth]
+        else:
+            top = np.tile(np.arange(depth), (len(distances), 1))
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        order = np.argsort(top_distances, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_distances = np.take_along_axis(top_distances, order, axis=1)
+
+        # Runner-up distance for the top candidate, best distance for everyone else
+        runner_up = top_distances[:, 1] if depth > 1 else np.full(len(distances), np.inf)
+
+        results = []
+        for face, (indices, face_distances) in enumerate(zip(top[:, :k], top_distances[:, :k])):
+            candidates = []
+            for rank, (column, distance) in enumerate(zip(indices, face_distances)):
+                index = student_ids[column]
+                competitor = runner_up[face] if rank == 0 else face_distances[0]
+                name, roll_no = self.students[index]
+                candidates.append(Candidate(name, roll_no, float(distance), float(1 - distance), float(competitor - distance)))
+            results.append(candidates)
+        return results
+
+    def identify(self, face_encodings, confidence_threshold=0.7):
+        # Best (name, roll_no, confidence) per face, or UNKNOWN when confidence is too low
+        identities = []
+        for candidates in self.match(face_encodings, k=1):
+            if candidates and candidates[0].confidence >= confidence_threshold:
+                best = candidates[0]
+                identities.append((best.name, best.roll_no, best.confidence))
+            else:
+                confidence = candidates[0].confidence if candidates else 0.0
+                identities.append((UNKNOWN_NAME, UNKNOWN_ROLL_NO, confidence))
+        return identities
+
+
+class MatcherView:
+    """Some of a FaceMatcher's students, matched without copying the gallery.
+
+    Only the students' indices and their gallery rows are stored, so any number of views
+    (one per class roster, say) cost a few integers per sample on top of the one shared
+    gallery, and switching between them is O(1). Views always match exactly; the full
+    matcher's ANN index covers every student and is not used.
+    """
+
+    def __init__(self, matcher, students):
+        self.matcher = matcher
+        self.student_ids = np.asarray(students, dtype=np.int64)
+        self.rows, self.local_offsets = matcher._student_rows(self.student_ids)
+        self.students = [matcher.students[i] for i in self.student_ids]
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    def student_distances(self, face_encodings):
+        # (faces, view students) distances, columns in student_ids order
+        matcher = self.matcher
+        queries = np.asarray(face_encodings, dtype=np.float32).reshape(-1, 128)
+        if not len(self.student_ids) or not len(queries):
+            return np.empty((len(queries), len(self.student_ids)), dtype=np.float32)
+        if matcher.reduction == "centroid":
+            ids = self.student_ids
+            return matcher._euclidean(queries, matcher.centroids[ids], matcher.centroid_sq_norms[ids])
+        if matcher.centroid_tier and matcher.centroid_tier < len(self.student_ids):
+            return matcher._tiered_student_distances(queries, self.student_ids)
+        distances = matcher._euclidean(queries, matcher._decode(self.rows), matcher.gallery_sq_norms[self.rows])
+        return np.minimum.reduceat(distances, self.local_offsets, axis=1)
+
+    def match(self, face_encodings, k=3):
+        return self.matcher._rank(self.student_distances(face_encodings), self.student_ids, k)
+
+    identify = FaceMatcher.identify
+
+
+def decision_changes(reference, candidate, face_encodings, confidence_threshold=0.7):
+    # How many accept/reject decisions at the threshold differ between two matchers
+    expected = reference.identify(face_encodings, confidence_threshold)
+    actual = candidate.identify(face_encodings, confidence_threshold)
+    accepted = [identity[1] != UNKNOWN_ROLL_NO for identity in expected]
+    changes = {"faces": len(expected), "accepted": sum(accepted),
+               "newly_rejected": 0, "newly_accepted": 0, "different_student": 0,
+               "max_confidence_shift": max((abs(a[2] - b[2]) for a, b in zip(expected, actual)), default=0.0)}
+    for was_accepted, before, after in zip(accepted, expected, actual):
+        now_accepted = after[1] != UNKNOWN_ROLL_NO
+        if was_accepted and not now_accepted:
+            changes["newly_rejected"] += 1
+        elif now_accepted and not was_accepted:
+            changes["newly_accepted"] += 1
+        elif was_accepted and before[1] != after[1]:
+            changes["different_student"] += 1
+    changes["changed"] = changes["newly_rejected"] + changes["newly_accepted"] + changes["different_student"]
+    return changes
@@ -0,0 +1,157 @@
+# Standard libraries
+import os  # Operating system functions
+import json  # JSON export
+import time  # Stage timing
+import threading  # Periodic exporter and thread-safe updates
+
+# Third-party libraries
+import cv2  # OpenCV for computer vision tasks
+import numpy as np  # NumPy for numerical operations
+
+# Python's built-in libraries
+from collections import deque  # Rolling sample windows
+from contextlib import contextmanager, nullcontext  # Stage timers
+
+STAGES = ("capture_read", "color_conversion", "detection", "encoding", "matching", "overlay", "attendance_write", "end_to_end")
+COUNTERS = ("frames", "faces", "matches", "unknowns", "drops", "attendance_marked")
+PERCENTILES = (50, 95, 99)
+
+
+class RollingHistogram:
+    """Last `window` samples of a duration, summarised as percentiles on demand."""
+
+    def __init__(self, window=1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def summary(self):
+        # Percentiles in milliseconds over the window, plus lifetime count and sum
+        summary = {"count": self.count, "sum_seconds": round(self.total, 6)}
+        if self.samples:
+            values = np.percentile(np.fromiter(self.samples, dtype=np.float64), PERCENTILES) * 1000
+            summary.update({f"p{p}_ms": round(float(v), 3) for p, v in zip(PERCENTILES, values)})
+        return summary
+
+
+class Metrics:
+    """Per-stage timings, counters and live FPS for the recognition loop."""
+
+    def __init__(self, window=1000):
+        self.histograms = {stage: RollingHistogram(window) for stage in STAGES}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.frame_times = deque(maxlen=60)  # Display timestamps for the FPS estimate
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def time(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            self.histograms[stage].add(seconds)
+
+    def increment(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def set_counter(self, counter, value):
+        with self.lock:
+            self.counters[counter] = value
+
+    def frame_displayed(self, captured_at=None):
+        # Count a finished frame; captured_at (time.monotonic) gives its end-to-end latency
+        now = time.monotonic()
+        with self.lock:
+            self.frame_times.append(now)
+            self.counters["frames"] += 1
+            if captured_at is not None:
+                self.histograms["end_to_end"].add(now - captured_at)
+
+    def fps(self):
+        with self.lock:
+            if len(self.frame_times) < 2:
+                return 0.0
+            return (len(self.frame_times) - 1) / max(self.frame_times[-1] - self.frame_times[0], 1e-6)
+
+    def snapshot(self):
+        with self.lock:
+            stages = {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+            counters = dict(self.counters)
+        return {"timestamp": time.time(), "uptime_seconds": round(time.time() - self.started_at, 3),
+                "fps": round(self.fps(), 2), "counters": counters, "stages": stages}
+
+    def draw_overlay(self, frame):
+        # Live FPS and end-to-end latency in the top-left corner of an OpenCV frame
+        latency = self.histograms["end_to_end"].summary()
+        text = f"FPS {self.fps():.1f}  latency p50 {latency.get('p50_ms', 0):.0f} ms  p95 {latency.get('p95_ms', 0):.0f} ms"
+        cv2.putText(frame, text, (10, 25), cv2.FONT_HERSHEY_DUPLEX, 0.6, (56, 195, 255), 1)
+
+
+def timed(metrics, stage):
+    # Stage timer that does nothing when metrics are disabled
+    return metrics.time(stage) if metrics is not None else nullcontext()
+
+
+def to_prometheus(snapshot, prefix="faceapp"):
+    # Prometheus text exposition format for a Metrics.snapshot()
+    lines = [f"# TYPE {prefix}_fps gauge", f"{prefix}_fps {snapshot['fps']}"]
+    for counter, value in snapshot["counters"].items():
+        lines += [f"# TYPE {prefix}_{counter}_total counter", f"{prefix}_{counter}_total {value}"]
+    lines.append(f"# TYPE {prefix}_stage_seconds summary")
+    for stage, summary in snapshot["stages"].items():
+        for p in PERCENTILES:
+            if f"p{p}_ms" in summary:
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{p / 100}"}} {summary[f"p{p}_ms"] / 1000:.6f}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {summary["count"]}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {summary["sum_seconds"]}')
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Writes a Metrics snapshot to a file every `interval` seconds.
+
+    Files ending in .prom get Prometheus text format (for node_exporter's textfile
+    collector); anything else gets JSON. Each write replaces the file atomically.
+    """
+
+    def __init__(self, metrics, path, interval=10.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join(timeout=2)
+        self.export()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.export()
+
+    def export(self):
+        snapshot = self.metrics.snapshot()
+        content = to_prometheus(snapshot) if self.path.endswith(".prom") else json.dumps(snapshot, indent=2)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w') as f:
+            f.write(content)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,192 @@
+# Standard libraries
+import os  # Operating system functions
+import sys  # Worker errors on standard error
+import time  # Event timestamps and idle timeouts
+import queue  # Empty exception for the event queue
+import argparse  # Command line parsing
+import multiprocessing  # One worker process per camera
+
+# Third-party libraries
+import numpy as np  # NumPy for numerical operations
+
+# Python's built-in libraries
+from datetime import datetime  # Date and time handling
+from multiprocessing import shared_memory  # Gallery shared between worker processes
+
+# Local modules
+from gallery import load_gallery  # Packed, memory-mapped face gallery
+from matcher import FaceMatcher, UNKNOWN_ROLL_NO  # Vectorized face matcher
+from pipeline import RecognitionPipeline, open_video_capture  # Threaded recognition pipeline
+from detection import FaceDetector  # Downscaled detection, full-resolution encoding
+from tracker import PENDING_ROLL_NO  # Roll number of faces not matched yet
+from attendance import AttendanceStore  # Attendance database and monthly CSV files
+
+STALL_TIMEOUT = 10.0  # Seconds without a frame before a camera or stream is reported dead
+
+
+def share_arrays(arrays):
+    # Copy named arrays into one shared memory block; returns the block and the layout
+    # workers need to map them back as read-only views
+    layout = {}
+    offset = 0
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        layout[key] = (offset, array.shape, array.dtype.str)
+        offset += array.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(1, offset))
+    for key, array in arrays.items():
+        start, shape, dtype = layout[key]
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+        view[...] = array
+    return block, layout
+
+
+def attach_arrays(block_name, layout):
+    block = shared_memory.SharedMemory(name=block_name)
+    arrays = {}
+    for key, (start, shape, dtype) in layout.items():
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+        view.flags.writeable = False
+        arrays[key] = view
+    return block, arrays
+
+
+def parse_source(source):
+    # "0" -> camera index 0; anything else (RTSP URL, video file) is passed to OpenCV as is
+    return int(source) if source.isdigit() else source
+
+
+def camera_worker(source, block_name, layout, metadata, events, stop_event, confidence_threshold, detector_options, report_interval,
+                  stall_timeout=STALL_TIMEOUT):
+    # Runs in its own process: recognise faces from one source and report them to the coordinator
+    # as ("seen", source, name, roll_no, confidence, time) events, or one ("error", source, message)
+    # before exiting when the source cannot be opened or stops delivering frames
+    is_file = isinstance(source, str) and os.path.isfile(source)
+    video_capture = open_video_capture(source)
+    if not video_capture.isOpened():
+        events.put(("error", str(source), "could not open the camera or stream"))
+        return
+
+    block, arrays = attach_arrays(block_name, layout)
+    matcher = FaceMatcher.from_state(arrays, metadata)
+    started = time.monotonic()
+    pipeline = RecognitionPipeline(video_capture, matcher, confidence_threshold, detect_workers=1,
+                                   detector=FaceDetector(**detector_options), stop_at_end=is_file).start()
+
+    # Only forward a student again after report_interval seconds; the coordinator owns the real dedup
+    last_reported = {}
+    idle_since = time.monotonic()
+    try:
+        while not stop_event.is_set():
+            result = pipeline.next_result(timeout=0.1)
+            if result is None:
+                if pipeline.finished.is_set() and time.monotonic() - idle_since > max(1.0, 2 * pipeline.max_latency):
+                    break
+                if not is_file and time.monotonic() - (pipeline.last_frame_at or started) > stall_timeout:
+                    events.put(("error", str(source), f"no frames for {stall_timeout:.0f} seconds"))
+                    break
+                continue
+            idle_since = time.monotonic()
+
+            for name, roll_no, confidence in result.identities:
+                if roll_no in (UNKNOWN_ROLL_NO, PENDING_ROLL_NO) or time.monotonic() - last_reported.get(roll_no, -report_interval) < report_interval:
+                    continue
+                last_reported[roll_no] = time.monotonic()
+                events.put(("seen", str(source), name, roll_no, confidence, datetime.now()))
+    finally:
+        pipeline.stop()
+        video_capture.release()
+        del matcher, arrays
+        block.close()
+
+
+class MultiCameraCoordinator:
+    """Starts one recognition process per source and owns the attendance writes.
+
+    The gallery is stacked once by the coordinator and placed in shared memory, so every
+    worker maps the same read-only matrix instead of loading npy_data/ itself. Workers send
+    (source, name, roll_no, confidence, time) events back over a queue; the coordinator
+    deduplicates them through its AttendanceStore and is the only process that writes attendance.
+    A worker whose source fails to open or stops delivering frames reports it and exits; the
+    reason is kept in `errors`.
+    """
+
+    def __init__(self, sources, confidence_threshold=0.7, detector_options=None, attendance_log=None, report_interval=5.0):
+        self.sources = [parse_source(str(source)) for source in sources]
+        self.confidence_threshold = confidence_threshold
+        self.detector_options = detector_options or {}
+        self.attendance_log = attendance_log or AttendanceStore()
+        self.report_interval = report_interval
+
+        self.context = multiprocessing.get_context("spawn")
+        self.events = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.processes = []
+        self.errors = {}  # Source -> why its worker gave up
+        self.block = None
+
+    def start(self):
+        arrays, metadata = FaceMatcher.from_gallery(load_gallery()).state()
+        self.block, layout = share_arrays(arrays)
+        for source in self.sources:
+            process = self.context.Process(target=camera_worker, name=f"camera-{source}", daemon=True,
+                                           args=(source, self.block.name, layout, metadata, self.events, self.stop_event,
+                                                 self.confidence_threshold, self.detector_options, self.report_interval))
+            process.start()
+            self.processes.append(process)
+        return self
+
+    def run(self, duration=None):
+        # Consume recognition events until every worker exits, duration elapses or Ctrl+C
+        deadline = time.monotonic() + duration if duration else None
+        try:
+            while any(process.is_alive() for process in self.processes):
+                if deadline and time.monotonic() >= deadline:
+                    break
+                self._drain(timeout=0.2)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _drain(self, timeout=0.0):
+        try:
+            event = self.events.get(timeout=timeout)
+        except queue.Empty:
+            return
+        if event[0] == "error":
+            _, source, message = event
+            self.errors[source] = message
+            print(f"[{source}] stopped: {message}", file=sys.stderr)
+            return
+        _, source, name, roll_no, confidence, seen_at = event
+        if self.attendance_log.mark(name, roll_no, seen_at):
+            print(f"[{source}] {name} {roll_no} ({confidence:.2f})")
+
+    def stop(self):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        # Pick up anything the workers reported while shutting down
+        while not self.events.empty():
+            self._drain()
+        self.attendance_log.close()
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Take attendance from several cameras at once.")
+    parser.add_argument("--source", action="append", required=True, help="camera index, RTSP URL or video file (repeatable)")
+    parser.add_argument("--threshold", type=float, default=0.7, help="minimum confidence to accept a match")
+    parser.add_argument("--detector", default="hog", help="detector backend: hog, cnn, haar, lbp or dnn")
+    parser.add_argument("--scale", type=float, default=0.5, help="detection scale factor")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    args = parser.parse_args()
+
+    coordinator = MultiCameraCoordinator(args.source, args.threshold, {"backend": args.detector, "scale": args.scale})
+    coordinator.start().run(args.duration)
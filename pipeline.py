@@ -0,0 +1,224 @@
+# Standard libraries
+import time  # Frame timestamps
+import threading  # Stage threads
+
+# Third-party libraries
+import cv2  # OpenCV for computer vision tasks
+
+# Python's built-in libraries
+from collections import deque, namedtuple  # Bounded buffers and result records
+
+# Local modules
+from tracker import FaceTracker, PENDING_ROLL_NO  # Track faces between frames to skip redundant encodings
+from detection import FaceDetector, encode_faces  # Downscaled detection, full-resolution encoding
+from metrics import Metrics, timed  # Per-stage timings and counters
+from matcher import UNKNOWN_ROLL_NO  # Roll number reported for unrecognised faces
+
+# One processed frame on its way through the pipeline. face_encodings holds None for faces
+# whose track already has a cached identity, and identities holds a (name, roll_no,
+# confidence) entry per face location once the matcher stage has run.
+FrameResult = namedtuple("FrameResult", ["seq", "captured_at", "frame", "face_locations", "track_ids", "face_encodings", "identities"])
+
+
+class DropOldestQueue:
+    """Bounded, thread-safe queue that evicts its oldest item instead of blocking the producer."""
+
+    def __init__(self, maxsize=1):
+        self.items = deque()
+        self.maxsize = max(1, maxsize)
+        self.dropped = 0
+        self.condition = threading.Condition()
+
+    def put(self, item):
+        with self.condition:
+            if len(self.items) >= self.maxsize:
+                self.items.popleft()
+                self.dropped += 1
+            self.items.append(item)
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        # Oldest queued item, or None if nothing arrives before the timeout
+        with self.condition:
+            if not self.items:
+                self.condition.wait(timeout)
+            if not self.items:
+                return None
+            return self.items.popleft()
+
+    def wake_all(self):
+        with self.condition:
+            self.condition.notify_all()
+
+    def __len__(self):
+        return len(self.items)
+
+
+def detect_frame(detector, tracker, encode, seq, captured_at, frame, now, metrics=None):
+    # Detection/encoding stage for one frame. Returns a FrameResult without identities, or
+    # None when the tracker has already seen a newer frame.
+    # Convert to RGB once; detection runs on a shrunken copy, encoding on this full frame
+    with timed(metrics, "color_conversion"):
+        rgb_frame = detector.prepare(frame)
+    with timed(metrics, "detection"):
+        face_locations = detector.detect(rgb_frame)
+
+    tracked = tracker.update(seq, face_locations, now)
+    if tracked is None:
+        return None
+    track_ids, needs_encoding = tracked
+
+    # Only encode faces whose track has no trusted identity yet or is due for a refresh
+    face_encodings = [None] * len(face_locations)
+    to_encode = [i for i, needed in enumerate(needs_encoding) if needed]
+    if to_encode:
+        with timed(metrics, "encoding"):
+            for i, face_encoding in zip(to_encode, encode(rgb_frame, [face_locations[i] for i in to_encode])):
+                face_encodings[i] = face_encoding
+    return FrameResult(seq, captured_at, frame, face_locations, track_ids, face_encodings, None)
+
+
+def identify_frame(matcher, tracker, result, confidence_threshold, metrics=None):
+    # Matching stage for one frame: identify the freshly encoded faces in one batch, cache
+    # them on their tracks and fill in every face's identity from its track
+    encoded = [i for i, face_encoding in enumerate(result.face_encodings) if face_encoding is not None]
+    if encoded:
+        with timed(metrics, "matching"):
+            matches = matcher.identify([result.face_encodings[i] for i in encoded], confidence_threshold)
+        for i, identity in zip(encoded, matches):
+            tracker.set_identity(result.track_ids[i], identity)
+    identities = [tracker.identity(track_id) for track_id in result.track_ids]
+    if metrics is not None:
+        # Only faces the matcher actually rejected are unknowns; pending tracks are neither
+        unknowns = sum(identity[1] == UNKNOWN_ROLL_NO for identity in identities)
+        pending = sum(identity[1] == PENDING_ROLL_NO for identity in identities)
+        metrics.increment("faces", len(identities))
+        metrics.increment("matches", len(identities) - unknowns - pending)
+        metrics.increment("unknowns", unknowns)
+        metrics.increment("pending", pending)
+    return result._replace(identities=identities)
+
+
+class RecognitionPipeline:
+    """Capture -> detect/encode -> match -> display/write, each stage on its own thread(s).
+
+    The capture thread reads the camera as fast as it delivers frames and pushes them into a
+    drop-oldest queue, so the camera buffer never backs up. A bounded pool of workers runs
+    detection, associates faces with tracks and encodes only the faces whose track needs a
+    fresh identity. A single matcher thread identifies those faces, and the caller pulls
+    finished frames with next_result() on the thread that owns the OpenCV window. Frames
+    that waited more than max_latency seconds for a detection worker are dropped before
+    detection starts; once detected, a frame is only dropped if a newer one was delivered.
+    """
+
+    def __init__(self, video_capture, matcher, confidence_threshold=0.7, detect_workers=2,
+                 capture_queue_depth=1, match_queue_depth=2, result_queue_depth=2,
+                 max_latency=1.0, detector=None, encode=encode_faces, tracker=None, stop_at_end=False, scheduler=None, metrics=None):
+        self.video_capture = video_capture
+        self.matcher = matcher
+        self.confidence_threshold = confidence_threshold
+        self.max_latency = max_latency
+        self.detector = detector or FaceDetector()
+        self.encode = encode
+        self.tracker = tracker or FaceTracker(confidence_threshold)
+        self.scheduler = scheduler  # Optional FrameScheduler; None runs detection on every frame
+        self.latest_frame = None  # Most recent captured frame, for previews while detection idles
+        self.last_frame_at = None  # time.monotonic() of the last successful read, for stall checks
+        self.metrics = metrics or Metrics()
+
+        self.capture_queue = DropOldestQueue(capture_queue_depth)
+        self.match_queue = DropOldestQueue(match_queue_depth)
+        self.result_queue = DropOldestQueue(result_queue_depth)
+        self.stale_frames = 0
+        self.stop_at_end = stop_at_end  # Video files end; cameras only hiccup
+        self.finished = threading.Event()
+
+        self.stop_event = threading.Event()
+        self.threads = [threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+                        threading.Thread(target=self._match_loop, name="match", daemon=True)]
+        self.threads += [threading.Thread(target=self._detect_loop, name=f"detect-{i}", daemon=True) for i in range(max(1, detect_workers))]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        for stage_queue in (self.capture_queue, self.match_queue, self.result_queue):
+            stage_queue.wake_all()
+        for thread in self.threads:
+            thread.join(timeout=2)
+
+    @property
+    def dropped(self):
+        # Frames discarded by any stage because a newer frame overtook them
+        return self.capture_queue.dropped + self.match_queue.dropped + self.result_queue.dropped + self.stale_frames
+
+    def _is_stale(self, captured_at):
+        return time.monotonic() - captured_at > self.max_latency
+
+    def _capture_loop(self):
+        seq = 0
+        while not self.stop_event.is_set():
+            with self.metrics.time("capture_read"):
+                ret, frame = self.video_capture.read()
+            if not ret:
+                if self.stop_at_end:
+                    self.finished.set()
+                    return
+                time.sleep(0.01)
+                continue
+            seq += 1
+            self.latest_frame = frame
+            self.last_frame_at = time.monotonic()
+            if self.scheduler is not None and not self.scheduler.should_process(frame, time.monotonic()):
+                continue
+            self.capture_queue.put((seq, time.monotonic(), frame))
+
+    def _detect_loop(self):
+        while not self.stop_event.is_set():
+            item = self.capture_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            seq, captured_at, frame = item
+            if self._is_stale(captured_at):
+                self.stale_frames += 1
+                continue
+            started = time.monotonic()
+            result = detect_frame(self.detector, self.tracker, self.encode, seq, captured_at, frame, started, self.metrics)
+            if self.scheduler is not None:
+                self.scheduler.record_detection(time.monotonic() - started, result is not None and len(result.face_locations), time.monotonic())
+            if result is None:
+                # Another worker already tracked a newer frame
+                self.stale_frames += 1
+                continue
+            self.match_queue.put(result)
+
+    def _match_loop(self):
+        last_seq = 0
+        while not self.stop_event.is_set():
+            result = self.match_queue.get(timeout=0.1)
+            if result is None:
+                continue
+            # Workers finish out of order; never hand back a frame older than one already shown.
+            # Age is not checked again here: with detection slower than max_latency that
+            # would discard every frame
+            if result.seq <= last_seq:
+                self.stale_frames += 1
+                continue
+            last_seq = result.seq
+            self.result_queue.put(identify_frame(self.matcher, self.tracker, result, self.confidence_threshold, self.metrics))
+
+    def next_result(self, timeout=0.05):
+        # Next finished frame for the display/writer stage, or None
+        result = self.result_queue.get(timeout)
+        self.metrics.set_counter("drops", self.dropped)
+        return result
+
+
+def open_video_capture(source=1):
+    # Camera index, RTSP URL or video file; keep the driver-side buffer as small as it allows
+    video_capture = cv2.VideoCapture(source)
+    video_capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return video_capture
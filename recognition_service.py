@@ -0,0 +1,395 @@
+# Standard libraries
+import sys  # Client output
+import json  # Request and response bodies
+import time  # Load generator timings
+import asyncio  # Event loop for the service, client and load generator
+import argparse  # Command line parsing
+import multiprocessing  # Spawn context for the decode/encode pool
+
+# Third-party libraries
+import numpy as np  # NumPy for numerical operations
+
+# Python's built-in libraries
+from concurrent.futures import ProcessPoolExecutor  # Decoding, detection and encoding off the event loop
+from concurrent.futures.process import BrokenProcessPool  # A worker died, e.g. a crash inside dlib
+from urllib.parse import urlsplit, parse_qs  # Request targets
+
+# Local modules
+from gallery import GALLERY_DIRECTORY, ENCODING_SIZE  # Packed face gallery
+from matcher import UNKNOWN_ROLL_NO  # Roll number reported for unrecognised faces
+from warmup import Preloader  # Gallery and matcher kept warm, reloaded when the gallery changes
+from attendance import AttendanceStore  # Attendance database and monthly CSV files
+
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 16 * 2**20
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+# Per-process state set up once by init_worker
+worker_state = {}
+
+
+def init_worker(detector_options):
+    from detection import FaceDetector
+
+    worker_state["detector"] = FaceDetector(**detector_options)
+
+
+def encode_jpeg(data):
+    # Worker: decode one JPEG (or any format OpenCV reads), detect, and encode every face
+    import cv2
+    from detection import encode_faces
+
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Body is not a decodable image")
+    detector = worker_state["detector"]
+    rgb_frame = detector.prepare(frame)
+    face_locations = detector.detect(rgb_frame)
+    encodings = np.asarray(encode_faces(rgb_frame, face_locations), dtype=np.float32).reshape(-1, ENCODING_SIZE)
+    return [[int(v) for v in location] for location in face_locations], encodings
+
+
+class MicroBatcher:
+    """Collects faces from concurrent requests and matches them in one vectorized call.
+
+    A batch is closed when it holds max_batch faces or max_wait seconds after its first
+    request arrived, whichever comes first, so a lone request waits at most max_wait.
+    """
+
+    def __init__(self, identify, max_batch=256, max_wait=0.005):
+        self.identify_batch = identify
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.batched_faces = 0
+
+    async def identify(self, encodings):
+        if not len(encodings):
+            return []
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((encodings, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            faces = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+            while faces < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                faces += len(item[0])
+
+            # The matrix product releases the GIL, so a thread keeps the loop responsive
+            try:
+                identities = await loop.run_in_executor(None, self.identify_batch, np.concatenate([encodings for encodings, _ in items]))
+            except Exception as error:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            self.batches += 1
+            self.batched_faces += faces
+
+            start = 0
+            for encodings, future in items:
+                if not future.done():  # The client may have gone away
+                    future.set_result(identities[start:start + len(encodings)])
+                start += len(encodings)
+
+
+class RecognitionService:
+    """Local HTTP service around the detection/encoding/matching path.
+
+    POST /recognize     body: a JPEG frame; detection and encoding run in a process pool
+    POST /encodings     body: {"encodings": [[128 floats], ...]} computed on the device
+    GET  /health        gallery size and batching statistics
+
+    Both POST endpoints return {"faces": [{"name", "roll_no", "confidence", "marked"}, ...]}
+    (plus "box" for frames). Recognised faces are marked through the same AttendanceStore
+    as take_attendance unless the query string has mark=0; source=<name> is echoed back.
+    """
+
+    def __init__(self, gallery_directory=GALLERY_DIRECTORY, confidence_threshold=0.7, workers=None,
+                 detector_options=None, attendance_log=None, max_batch=256, max_wait=0.005):
+        self.preloader = Preloader(gallery_directory)
+        self.confidence_threshold = confidence_threshold
+        self.attendance_log = attendance_log
+        self.batcher = MicroBatcher(self._identify, max_batch, max_wait)
+        self.workers = workers
+        self.detector_options = detector_options or {}
+        self.pool = self._start_pool()
+        self.requests = 0
+
+    def _start_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=init_worker, initargs=(self.detector_options,))
+
+    def _identify(self, encodings):
+        # Runs on an executor thread; picks up gallery changes made by faceapp or bulk_enroll
+        return self.preloader.matcher().identify(encodings, self.confidence_threshold)
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+        self.preloader.matcher()  # Load the gallery before accepting connections
+        batcher_task = asyncio.create_task(self.batcher.run())
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving recognition on {unix_path or f'http://{host}:{port}'}", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+            self.pool.shutdown(cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        # HTTP/1.1 with keep-alive so devices can stream frames over one connection
+        try:
+            while True:
+                try:
+                    request = await read_message(reader, request=True)
+                except (ValueError, asyncio.IncompleteReadError) as error:
+                    await write_response(writer, 413 if "too large" in str(error) else 400, {"error": str(error)}, close=True)
+                    break
+                if request is None:
+                    break
+                (method, target), headers, body = request
+                status, payload = await self.dispatch(method, target, headers, body)
+                close = headers.get("connection", "").lower() == "close"
+                await write_response(writer, status, payload, close)
+                if close:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        mark = query.get("mark", "1") != "0"
+        try:
+            if method == "GET" and url.path == "/health":
+                return 200, self.health()
+            if method == "POST" and url.path == "/recognize":
+                boxes, encodings = await asyncio.get_running_loop().run_in_executor(self.pool, encode_jpeg, body)
+            elif method == "POST" and url.path == "/encodings":
+                boxes, encodings = None, parse_encodings(body)
+            else:
+                return 404, {"error": f"No route for {method} {url.path}"}
+        except ValueError as error:
+            return 400, {"error": str(error)}
+        except BrokenProcessPool as error:
+            # Every later frame would fail the same way; replace the pool for the next request
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = self._start_pool()
+            return 500, {"error": f"Encoding worker crashed: {error}"}
+        except Exception as error:  # e.g. cv2.error; the client still gets a response
+            return 500, {"error": str(error)}
+
+        self.requests += 1
+        try:
+            identities = await self.batcher.identify(encodings)
+        except Exception as error:
+            return 500, {"error": str(error)}
+        faces = []
+        for i, (name, roll_no, confidence) in enumerate(identities):
+            marked = False
+            if mark and self.attendance_log is not None and roll_no != UNKNOWN_ROLL_NO:
+                marked = self.attendance_log.mark(name, roll_no)
+            face = {"name": name, "roll_no": roll_no, "confidence": round(float(confidence), 4), "marked": marked}
+            if boxes is not None:
+                face["box"] = boxes[i]
+            faces.append(face)
+        response = {"faces": faces}
+        if "source" in query:
+            response["source"] = query["source"]
+        return 200, response
+
+    def health(self):
+        matcher = self.preloader.matcher()
+        return {"students": len(matcher), "requests": self.requests, "batches": self.batcher.batches,
+                "mean_batch_faces": self.batcher.batched_faces / max(self.batcher.batches, 1)}
+
+
+def parse_encodings(body):
+    try:
+        encodings = np.asarray(json.loads(body)["encodings"], dtype=np.float32)
+    except (KeyError, TypeError, json.JSONDecodeError) as error:
+        raise ValueError(f"Expected {{\"encodings\": [[{ENCODING_SIZE} floats], ...]}}: {error}")
+    if encodings.size == 0:
+        return encodings.reshape(0, ENCODING_SIZE)
+    if encodings.ndim != 2 or encodings.shape[1] != ENCODING_SIZE or not np.isfinite(encodings).all():
+        raise ValueError(f"Encodings must be finite {ENCODING_SIZE}-d vectors, got shape {encodings.shape}")
+    return encodings
+
+
+async def read_message(reader, request):
+    # One HTTP/1.1 request or response: (start line fields, lower-cased headers, body), or None at EOF
+    start_line = await reader.readline()
+    if not start_line:
+        return None
+    fields = start_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+    if len(fields) < 2:
+        raise ValueError("Malformed start line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_BYTES:
+        raise ValueError("Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return (fields[0], fields[1]) if request else (fields[0], int(fields[1])), headers, body
+
+
+async def write_response(writer, status, payload, close=False):
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: {'close' if close else 'keep-alive'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def open_connection(address):
+    # "host:port" or "unix:/path/to/socket"
+    if address.startswith("unix:"):
+        return await asyncio.open_unix_connection(address[len("unix:"):])
+    host, _, port = address.rpartition(":")
+    return await asyncio.open_connection(host or "127.0.0.1", int(port))
+
+
+async def request(reader, writer, method, target, body=b"", content_type="application/json"):
+    # One keep-alive request on an open connection; returns (status, decoded JSON body)
+    head = (f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+    response = await read_message(reader, request=False)
+    if response is None:
+        raise ConnectionError("Service closed the connection")
+    (_, status), _, response_body = response
+    return status, json.loads(response_body)
+
+
+def build_request(image=None, encodings=None, mark=True, source=None):
+    # (method, target, body, content type) for a frame or for pre-computed encodings
+    query = [] if mark else ["mark=0"]
+    if source:
+        query.append(f"source={source}")
+    suffix = "?" + "&".join(query) if query else ""
+    if image is not None:
+        return "POST", "/recognize" + suffix, image, "image/jpeg"
+    body = json.dumps({"encodings": np.asarray(encodings).tolist()}).encode()
+    return "POST", "/encodings" + suffix, body, "application/json"
+
+
+async def load_test(address, requests_to_send, total, concurrency=16):
+    # Fire `total` requests over `concurrency` keep-alive connections; report throughput and tail latency
+    latencies = []
+    failures = 0
+    counter = iter(range(total))
+
+    async def client():
+        nonlocal failures
+        reader, writer = await open_connection(address)
+        try:
+            for i in counter:
+                method, target, body, content_type = requests_to_send[i % len(requests_to_send)]
+                start = time.perf_counter()
+                status, _ = await request(reader, writer, method, target, body, content_type)
+                latencies.append(time.perf_counter() - start)
+                failures += status != 200
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    milliseconds = np.asarray(latencies) * 1000
+    return {"requests": len(latencies), "failures": failures, "seconds": elapsed,
+            "requests_per_second": len(latencies) / elapsed,
+            **{f"p{p}_ms": float(np.percentile(milliseconds, p)) for p in (50, 95, 99)},
+            "max_ms": float(milliseconds.max())}
+
+
+async def run_client(address, images, mark, source):
+    reader, writer = await open_connection(address)
+    try:
+        for path in images:
+            with open(path, 'rb') as f:
+                method, target, body, content_type = build_request(image=f.read(), mark=mark, source=source)
+            status, payload = await request(reader, writer, method, target, body, content_type)
+            print(json.dumps({"image": path, "status": status, **payload}))
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local recognition service, client and load generator.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the service")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--unix", default=None, help="listen on this Unix socket instead of TCP")
+    serve.add_argument("--gallery-dir", default=GALLERY_DIRECTORY)
+    serve.add_argument("--threshold", type=float, default=0.7, help="minimum confidence to accept a match")
+    serve.add_argument("--workers", type=int, default=None, help="decode/encode process pool size (default: CPU count)")
+    serve.add_argument("--detector", default="hog", help="detector backend: hog, cnn, haar, lbp or dnn")
+    serve.add_argument("--scale", type=float, default=0.5, help="detection scale factor")
+    serve.add_argument("--max-batch", type=int, default=256, help="faces per matching batch")
+    serve.add_argument("--max-wait-ms", type=float, default=5.0, help="longest a request waits for its batch to fill")
+    serve.add_argument("--no-attendance", action="store_true", help="identify only; never mark attendance")
+
+    client = commands.add_parser("client", help="send image files and print the results")
+    client.add_argument("images", nargs="+")
+    client.add_argument("--address", default=f"127.0.0.1:{DEFAULT_PORT}", help="host:port or unix:/path")
+    client.add_argument("--no-mark", action="store_true")
+    client.add_argument("--source", default=None, help="device name echoed back by the service")
+
+    load = commands.add_parser("load", help="load-test the service")
+    load.add_argument("--address", default=f"127.0.0.1:{DEFAULT_PORT}", help="host:port or unix:/path")
+    load.add_argument("--image", default=None, help="send this frame (default: random encodings)")
+    load.add_argument("--faces", type=int, default=2, help="encodings per request when no --image is given")
+    load.add_argument("--requests", type=int, default=2000)
+    load.add_argument("--concurrency", type=int, default=32)
+    load.add_argument("--mark", action="store_true", help="let the load test mark attendance")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        attendance_log = None if args.no_attendance else AttendanceStore()
+        service = RecognitionService(args.gallery_dir, args.threshold, args.workers,
+                                     {"backend": args.detector, "scale": args.scale}, attendance_log,
+                                     args.max_batch, args.max_wait_ms / 1000)
+        try:
+            asyncio.run(service.serve(args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if attendance_log is not None:
+                attendance_log.close()
+    elif args.command == "client":
+        asyncio.run(run_client(args.address, args.images, not args.no_mark, args.source))
+    else:
+        if args.image:
+            with open(args.image, 'rb') as f:
+                requests_to_send = [build_request(image=f.read(), mark=args.mark)]
+        else:
+            rng = np.random.default_rng(0)
+            requests_to_send = [build_request(encodings=rng.normal(0, 0.1, (args.faces, ENCODING_SIZE)), mark=args.mark)
+                                for _ in range(64)]
+        print(json.dumps(asyncio.run(load_test(args.address, requests_to_send, args.requests, args.concurrency)), indent=2))
@@ -0,0 +1,136 @@
+# Standard libraries
+import time  # Burst timing
+
+# Third-party libraries
+import cv2  # OpenCV for computer vision tasks
+import numpy as np  # NumPy for numerical operations
+import face_recognition  # Face recognition library
+
+# Python's built-in libraries
+from collections import namedtuple  # Lightweight result records
+from concurrent.futures import ThreadPoolExecutor  # Parallel encoding of the chosen samples
+
+# Local modules
+from detection import FaceDetector  # Downscaled detection, full-resolution encoding
+from matcher import FaceMatcher  # Vectorized face matcher
+
+# One usable frame from the burst: the RGB frame, its single face box and quality measures
+RegistrationCandidate = namedtuple("RegistrationCandidate", ["rgb_frame", "face_location", "sharpness", "size", "pose", "score"])
+
+# Result of a registration attempt. duplicate is (name, roll_no, confidence) of an existing
+# student the new face matches, or None.
+RegistrationResult = namedtuple("RegistrationResult", ["encodings", "candidates", "duplicate"])
+
+
+def capture_burst(video_capture, num_frames=30, max_seconds=4.0, preview_title='Face Registration', on_preview=None):
+    # Grab a short burst of frames, showing a live preview instead of pausing between samples;
+    # on_preview receives the preview frames instead of an OpenCV window when given
+    frames = []
+    start = time.monotonic()
+    while len(frames) < num_frames and time.monotonic() - start < max_seconds:
+        ret, frame = video_capture.read()
+        if not ret:
+            continue
+        frames.append(frame)
+        if preview_title or on_preview:
+            preview = frame.copy()
+            cv2.putText(preview, f"Scanning... {len(frames)}/{num_frames}", (20, 40), cv2.FONT_HERSHEY_DUPLEX, 1.0, (0, 255, 0), 2)
+            if on_preview is not None:
+                on_preview(preview)
+            else:
+                cv2.imshow(preview_title, preview)
+                cv2.waitKey(1)
+    return frames
+
+
+def estimate_pose(rgb_frame, face_location):
+    # Rough (yaw, pitch) from the 5-point landmarks: how far the nose sits from the eye
+    # midpoint, in units of the distance between the eyes
+    landmarks = face_recognition.face_landmarks(rgb_frame, [face_location], model="small")
+    if not landmarks:
+        return np.zeros(2)
+    points = landmarks[0]
+    left_eye = np.mean(points["left_eye"], axis=0)
+    right_eye = np.mean(points["right_eye"], axis=0)
+    nose = np.mean(points["nose_tip"], axis=0)
+    eye_midpoint = (left_eye + right_eye) / 2
+    eye_distance = max(np.linalg.norm(right_eye - left_eye), 1.0)
+    return (nose - eye_midpoint) / eye_distance
+
+
+def score_candidates(frames, detector):
+    # Detect each frame once and keep frames with exactly one face, scored for sharpness and size
+    candidates = []
+    for frame in frames:
+        rgb_frame = detector.prepare(frame)
+        face_locations = detector.detect(rgb_frame)
+        if len(face_locations) != 1:
+            continue
+        top, right, bottom, left = face_locations[0]
+        face = cv2.cvtColor(rgb_frame[top:bottom, left:right], cv2.COLOR_RGB2GRAY)
+        if face.size == 0:
+            continue
+        sharpness = cv2.Laplacian(face, cv2.CV_64F).var()  # Variance of the Laplacian: low when blurred
+        size = (bottom - top) * (right - left) / float(rgb_frame.shape[0] * rgb_frame.shape[1])
+        pose = estimate_pose(rgb_frame, face_locations[0])
+        candidates.append(RegistrationCandidate(rgb_frame, face_locations[0], sharpness, size, pose, 0.0))
+
+    if not candidates:
+        return []
+    # Normalise sharpness and size within the burst so they weigh the same
+    sharpness = np.array([c.sharpness for c in candidates])
+    size = np.array([c.size for c in candidates])
+    scores = sharpness / max(sharpness.max(), 1e-6) + size / max(size.max(), 1e-6)
+    return [c._replace(score=float(s)) for c, s in zip(candidates, scores)]
+
+
+def select_diverse(candidates, count, diversity_weight=1.0):
+    # Greedy pick: best quality first, then whichever candidate adds the most pose variety
+    remaining = list(candidates)
+    chosen = []
+    while remaining and len(chosen) < count:
+        def gain(candidate):
+            if not chosen:
+                return candidate.score
+            spread = min(np.linalg.norm(candidate.pose - c.pose) for c in chosen)
+            return candidate.score + diversity_weight * spread
+        best = max(remaining, key=gain)
+        chosen.append(best)
+        remaining.remove(best)
+    return chosen
+
+
+def encode_candidates(candidates, workers=4):
+    # Encode the chosen frames in parallel on a small thread pool
+    def encode(candidate):
+        return face_recognition.face_encodings(candidate.rgb_frame, [candidate.face_location])[0]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(encode, candidates))
+
+
+def find_duplicate(encodings, roll_no, gallery, confidence_threshold=0.7):
+    # 1:N check of the new encodings against everyone else in the gallery, in one batch
+    matcher = FaceMatcher.from_gallery(gallery)
+    best = None
+    for candidates in matcher.match(encodings, k=2):
+        for candidate in candidates:
+            if candidate.roll_no == roll_no or candidate.confidence < confidence_threshold:
+                continue
+            if best is None or candidate.confidence > best[2]:
+                best = (candidate.name, candidate.roll_no, candidate.confidence)
+            break
+    return best
+
+
+def register_from_camera(video_capture, roll_no, gallery, num_samples=5, burst_frames=30, max_bursts=3, detector=None, confidence_threshold=0.7, on_preview=None):
+    # Burst capture -> single detection pass and quality ranking -> parallel encoding -> duplicate check
+    detector = detector or FaceDetector(scale=0.5)
+    scored = []
+    for _ in range(max_bursts):
+        scored += score_candidates(capture_burst(video_capture, burst_frames, on_preview=on_preview), detector)
+        if len(scored) >= num_samples:
+            break
+    candidates = select_diverse(scored, num_samples)
+    encodings = encode_candidates(candidates) if candidates else []
+    duplicate = find_duplicate(encodings, roll_no, gallery, confidence_threshold) if encodings else None
+    return RegistrationResult(encodings, candidates, duplicate)
@@ -0,0 +1,144 @@
+# Standard libraries
+import os  # Operating system functions
+import json  # Snapshot and journal records
+
+# Python's built-in libraries
+from pathlib import Path  # Path manipulation
+from contextlib import contextmanager  # Transaction blocks
+
+CHECKPOINT_EVERY = 1000  # Journal records replayed before the snapshot is rewritten
+
+
+class StudentRegistry:
+    """Persistent roll_no -> {"name", "rows"} map with journaled, all-or-nothing updates.
+
+    State lives in registry.json (a snapshot) plus registry.journal, an append-only log with
+    one JSON line per committed transaction. A transaction is committed the moment its line
+    is fsynced; loading replays the snapshot and every complete journal line, and drops a
+    half-written last line left by a crash. Lookups are dict lookups and every change costs
+    one journal append, so management actions do not slow down as the gallery grows.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.snapshot_path = self.directory / "registry.json"
+        self.journal_path = self.directory / "registry.journal"
+        self.students = {}  # roll_no -> {"name": str, "rows": [gallery row numbers]}
+        self.journal_records = 0
+
+    def exists(self):
+        return self.snapshot_path.exists() or self.journal_path.exists()
+
+    def load(self):
+        self.students = {}
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path) as f:
+                self.students = json.load(f)
+
+        self.journal_records = 0
+        if self.journal_path.exists():
+            valid_bytes = 0
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Torn write from a crash: this transaction never committed
+                    try:
+                        operations = json.loads(line)
+                    except ValueError:
+                        break
+                    self._apply(operations)
+                    valid_bytes += len(line)
+                    self.journal_records += 1
+            if valid_bytes != self.journal_path.stat().st_size:
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(valid_bytes)
+        return self
+
+    def get(self, roll_no):
+        return self.students.get(roll_no)
+
+    def __contains__(self, roll_no):
+        return roll_no in self.students
+
+    def __len__(self):
+        return len(self.students)
+
+    @contextmanager
+    def transaction(self):
+        # Collect operations and commit them as one journal record; nothing is applied if the
+        # block raises
+        operations = []
+        yield Transaction(self, operations)
+        if operations:
+            self._commit(operations)
+
+    def rename(self, roll_no, new_name):
+        if roll_no not in self.students:
+            return False
+        with self.transaction() as transaction:
+            transaction.rename(roll_no, new_name)
+        return True
+
+    def delete(self, roll_no):
+        if roll_no not in self.students:
+            return False
+        with self.transaction() as transaction:
+            transaction.delete(roll_no)
+        return True
+
+    def add_rows(self, roll_no, name, rows):
+        with self.transaction() as transaction:
+            transaction.add_rows(roll_no, name, rows)
+
+    def _commit(self, operations):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_path, 'ab') as f:
+            f.write(json.dumps(operations).encode() + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(operations)
+        self.journal_records += 1
+        if self.journal_records >= CHECKPOINT_EVERY:
+            self.checkpoint()
+
+    def _apply(self, operations):
+        for operation in operations:
+            kind, roll_no = operation[0], operation[1]
+            if kind == "add":
+                _, _, name, rows = operation
+                student = self.students.setdefault(roll_no, {"name": name, "rows": []})
+                student["name"] = name
+                # Skip rows already present so replaying a journal over a newer snapshot is harmless
+                existing = set(student["rows"])
+                student["rows"].extend(row for row in rows if row not in existing)
+            elif kind == "rename" and roll_no in self.students:
+                self.students[roll_no]["name"] = operation[2]
+            elif kind == "delete":
+                self.students.pop(roll_no, None)
+
+    def checkpoint(self):
+        # Fold the journal into a fresh snapshot; the swap is atomic, then the journal restarts
+        temp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(temp_path, 'w') as f:
+            json.dump(self.students, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        with open(self.journal_path, 'wb') as f:
+            os.fsync(f.fileno())
+        self.journal_records = 0
+
+
+class Transaction:
+    def __init__(self, registry, operations):
+        self.registry = registry
+        self.operations = operations
+
+    def add_rows(self, roll_no, name, rows):
+        self.operations.append(["add", roll_no, name, [int(row) for row in rows]])
+
+    def rename(self, roll_no, new_name):
+        self.operations.append(["rename", roll_no, new_name])
+
+    def delete(self, roll_no):
+        self.operations.append(["delete", roll_no])
@@ -0,0 +1,250 @@
+# Standard libraries
+import os  # Operating system functions
+import sys  # Timings on standard error
+import csv  # CSV file handling
+import json  # Cache manifest
+import time  # Query timings
+import argparse  # Command line parsing
+
+# Third-party libraries
+import numpy as np  # NumPy for numerical operations
+
+# Python's built-in libraries
+from datetime import date  # Date and time handling
+
+# Local modules
+from attendance import CSV_DIRECTORY, CSV_NAME_PATTERN  # Monthly attendance CSV files
+
+CACHE_DIRECTORY = "report_cache"  # Inside the CSV directory
+MANIFEST_FILE = "manifest.json"
+STACKED_FILE = "history.npz"  # All months stacked and deduplicated, valid while the manifest matches
+SUMMARY_HEADER = ["Roll No", "Name", "Days Present", "Class Days", "Percentage"]
+
+
+def parse_day(text):
+    # DD-MM-YYYY (the attendance files' format) -> proleptic Gregorian ordinal
+    day, month, year = text.strip().split("-")
+    return date(int(year), int(month), int(day)).toordinal()
+
+
+def format_day(ordinal):
+    return date.fromordinal(int(ordinal)).strftime('%d-%m-%Y')
+
+
+def ingest_month(path):
+    # One Month_Year.csv as columns: roll numbers, names and day ordinals
+    rolls, names, days = [], [], []
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Skip the header row
+        for record in reader:
+            if len(record) != 3:
+                continue
+            try:
+                days.append(parse_day(record[1]))
+            except ValueError:
+                continue
+            rolls.append(record[0])
+            names.append(record[2])
+    return {"rolls": np.array(rolls, dtype=str), "names": np.array(names, dtype=str), "days": np.array(days, dtype=np.int32)}
+
+
+class AttendanceHistory:
+    """Every Month_Year.csv in csv_data/ held as columns, for fast attendance reports.
+
+    Each month's file is parsed once into a cached .npz. The cache is keyed by the file's
+    size and modification time, so refresh() only re-reads months that are new or changed.
+    The months are then stacked, and each roll number becomes an integer index; while no
+    month changes, refresh() loads that stacked result directly. Duplicate
+    marks for the same student and day count once. Queries are vectorized filters and
+    bincounts over two int32 arrays. A "class day" is any day with at least one record
+    in the range; percentages are days present out of class days.
+    """
+
+    def __init__(self, directory=CSV_DIRECTORY):
+        self.directory = directory
+        self.cache_directory = os.path.join(directory, CACHE_DIRECTORY)
+        self.roll_numbers = np.empty(0, dtype=str)  # Index -> roll number, sorted
+        self.names = []  # Index -> most recent name
+        self.rolls = np.empty(0, dtype=np.int32)  # One entry per (student, day) present
+        self.days = np.empty(0, dtype=np.int32)
+        self.ingested_months = 0
+
+    def refresh(self):
+        os.makedirs(self.cache_directory, exist_ok=True)
+        manifest_path = os.path.join(self.cache_directory, MANIFEST_FILE)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+        current = {}
+        for file in sorted(os.listdir(self.directory)):
+            if CSV_NAME_PATTERN.match(file):
+                stat = os.stat(os.path.join(self.directory, file))
+                current[file] = [stat.st_size, stat.st_mtime_ns]
+
+        self.ingested_months = 0
+        stacked_path = os.path.join(self.cache_directory, STACKED_FILE)
+        if current == manifest and os.path.exists(stacked_path):
+            with np.load(stacked_path) as stacked:
+                self.roll_numbers, self.rolls, self.days = stacked["roll_numbers"], stacked["rolls"], stacked["days"]
+                self.names = stacked["names"].tolist()
+            return self
+
+        months = []
+        for file, signature in current.items():
+            cache_path = os.path.join(self.cache_directory, file[:-4] + ".npz")
+            if manifest.get(file) == signature and os.path.exists(cache_path):
+                with np.load(cache_path) as cached:
+                    month = {key: cached[key] for key in cached.files}
+            else:
+                month = ingest_month(os.path.join(self.directory, file))
+                np.savez(cache_path, **month)
+                self.ingested_months += 1
+            months.append(month)
+
+        # Drop caches of months whose CSV has gone
+        for file in set(manifest) - set(current):
+            stale = os.path.join(self.cache_directory, file[:-4] + ".npz")
+            if os.path.exists(stale):
+                os.remove(stale)
+
+        self._stack(months)
+        np.savez(stacked_path, roll_numbers=self.roll_numbers, names=np.array(self.names, dtype=str), rolls=self.rolls, days=self.days)
+        # The manifest goes last: a crash before this point just means a re-ingest next time
+        with open(manifest_path + ".tmp", 'w') as f:
+            json.dump(current, f)
+        os.replace(manifest_path + ".tmp", manifest_path)
+        return self
+
+    def _stack(self, months):
+        rolls = np.concatenate([month["rolls"] for month in months] or [np.empty(0, dtype=str)])
+        names = np.concatenate([month["names"] for month in months] or [np.empty(0, dtype=str)])
+        days = np.concatenate([month["days"] for month in months] or [np.empty(0, dtype=np.int32)]).astype(np.int32)
+        self.roll_numbers, roll_index = np.unique(rolls, return_inverse=True)
+        roll_index = roll_index.astype(np.int32).ravel()
+
+        # Most recent name per student: the last record of each roll after sorting by (roll, day)
+        order = np.lexsort((days, roll_index))
+        last = order[np.r_[roll_index[order][1:] != roll_index[order][:-1], True]] if len(order) else order
+        self.names = names[last].tolist()
+
+        # One entry per (student, day) however many times they were marked that day
+        if len(days):
+            first_day = int(days.min())
+            span = int(days.max()) - first_day + 1
+            keys = np.unique(roll_index.astype(np.int64) * span + (days - first_day))
+            self.rolls = (keys // span).astype(np.int32)
+            self.days = (keys % span + first_day).astype(np.int32)
+        else:
+            self.rolls = np.empty(0, dtype=np.int32)
+            self.days = np.empty(0, dtype=np.int32)
+
+    def _range(self, start=None, end=None):
+        # Mask of records between two day ordinals, inclusive; None leaves that side open
+        mask = np.ones(len(self.days), dtype=bool)
+        if start is not None:
+            mask &= self.days >= start
+        if end is not None:
+            mask &= self.days <= end
+        return mask
+
+    def class_days(self, start=None, end=None):
+        return np.unique(self.days[self._range(start, end)])
+
+    def summary(self, start=None, end=None):
+        # (roll numbers, names, days present, class days, percentage) columns for every student
+        mask = self._range(start, end)
+        present = np.bincount(self.rolls[mask], minlength=len(self.roll_numbers))
+        held = len(np.unique(self.days[mask]))
+        percentage = present * 100.0 / held if held else np.zeros(len(present))
+        return self.roll_numbers, self.names, present, held, percentage
+
+    def student(self, roll_no, start=None, end=None):
+        # Days the student was present and their percentage over the range, or None if unknown
+        index = np.searchsorted(self.roll_numbers, roll_no)
+        if index >= len(self.roll_numbers) or self.roll_numbers[index] != roll_no:
+            return None
+        mask = self._range(start, end)
+        present = self.days[mask & (self.rolls == index)]
+        held = len(np.unique(self.days[mask]))
+        return {"roll_no": roll_no, "name": self.names[index], "days_present": np.sort(present), "class_days": held,
+                "percentage": len(present) * 100.0 / held if held else 0.0}
+
+    def daily(self, start=None, end=None):
+        # (day ordinals, students present) for every class day in the range
+        days, counts = np.unique(self.days[self._range(start, end)], return_counts=True)
+        return days, counts
+
+    def present_on(self, day):
+        # Roll numbers present on one day
+        return self.roll_numbers[self.rolls[self.days == day]]
+
+
+def write_summary(path, history, start=None, end=None, below=None):
+    roll_numbers, names, present, held, percentage = history.summary(start, end)
+    selected = np.flatnonzero(percentage < below) if below is not None else np.arange(len(roll_numbers))
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADER)
+        for i in selected:
+            writer.writerow([roll_numbers[i], names[i], int(present[i]), held, f"{percentage[i]:.1f}"])
+    return len(selected)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Attendance reports over the monthly CSV history.")
+    parser.add_argument("--directory", default=CSV_DIRECTORY)
+    date_range = argparse.ArgumentParser(add_help=False)
+    date_range.add_argument("--from", dest="start", default=None, help="first day, DD-MM-YYYY (default: earliest record)")
+    date_range.add_argument("--to", dest="end", default=None, help="last day, DD-MM-YYYY (default: latest record)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    summary = commands.add_parser("summary", parents=[date_range], help="days present and percentage per student")
+    summary.add_argument("--below", type=float, default=None, help="only students under this percentage")
+    summary.add_argument("--output", default=None, help="write the summary to this CSV instead of printing it")
+    student = commands.add_parser("student", parents=[date_range], help="one student's attendance")
+    student.add_argument("roll_no")
+    daily = commands.add_parser("daily", parents=[date_range], help="students present on each class day")
+    daily.add_argument("--output", default=None, help="write the counts to this CSV instead of printing them")
+    day = commands.add_parser("day", parents=[date_range], help="roll numbers present on one day")
+    day.add_argument("date", help="DD-MM-YYYY")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    history = AttendanceHistory(args.directory).refresh()
+    loaded = time.perf_counter()
+    start = parse_day(args.start) if args.start else None
+    end = parse_day(args.end) if args.end else None
+
+    if args.command == "summary":
+        if args.output:
+            count = write_summary(args.output, history, start, end, args.below)
+            print(f"Wrote {count} students to {args.output}")
+        else:
+            roll_numbers, names, present, held, percentage = history.summary(start, end)
+            for i in np.argsort(percentage, kind="stable"):
+                if args.below is None or percentage[i] < args.below:
+                    print(f"{roll_numbers[i]:>10s}  {names[i]:30s} {present[i]:4d}/{held:<4d} {percentage[i]:6.1f}%")
+    elif args.command == "student":
+        report = history.student(args.roll_no, start, end)
+        if report is None:
+            parser.exit(1, f"No attendance records for roll number {args.roll_no}\n")
+        print(f"{report['roll_no']} {report['name']}: {len(report['days_present'])}/{report['class_days']} class days ({report['percentage']:.1f}%)")
+        print(" ".join(format_day(d) for d in report["days_present"]))
+    elif args.command == "daily":
+        days, counts = history.daily(start, end)
+        if args.output:
+            with open(args.output, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["Date", "Present"])
+                writer.writerows([format_day(d), int(c)] for d, c in zip(days, counts))
+            print(f"Wrote {len(days)} days to {args.output}")
+        else:
+            for d, c in zip(days, counts):
+                print(f"{format_day(d)}  {c}")
+    else:
+        print("\n".join(history.present_on(parse_day(args.date))))
+
+    print(f"Loaded in {(loaded - started) * 1000:.1f} ms ({history.ingested_months} months re-ingested, {len(history.days)} records); "
+          f"query {(time.perf_counter() - loaded) * 1000:.1f} ms", file=sys.stderr)
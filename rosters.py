@@ -0,0 +1,144 @@
+# Standard libraries
+import os  # Operating system functions
+import csv  # Roster and timetable files
+import time  # Throttle timetable lookups
+import argparse  # Command line parsing
+
+# Python's built-in libraries
+from datetime import datetime  # Date and time handling
+
+# Local modules
+from matcher import UNKNOWN_ROLL_NO  # Roll number reported for unrecognised faces
+
+ROSTER_DIRECTORY = "roster_data"
+ROSTERS_FILE = "rosters.csv"  # Roster, Roll No
+TIMETABLE_FILE = "timetable.csv"  # Roster, Day, Start, End   e.g. CS-3A, Mon, 09:00, 10:30
+DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+CHECK_INTERVAL = 30.0  # Seconds between timetable lookups while matching
+
+
+def roster_paths(directory=ROSTER_DIRECTORY):
+    return os.path.join(directory, ROSTERS_FILE), os.path.join(directory, TIMETABLE_FILE)
+
+
+def load_rosters(directory=ROSTER_DIRECTORY):
+    # Roster name -> list of roll numbers, plus day index -> [(start, end, roster)] in minutes
+    rosters_path, timetable_path = roster_paths(directory)
+    rosters = {}
+    timetable = {day: [] for day in range(len(DAYS))}
+    if not os.path.exists(rosters_path):
+        return rosters, timetable
+
+    with open(rosters_path, newline='') as f:
+        for record in csv.DictReader(f):
+            rosters.setdefault(record["Roster"].strip(), []).append(record["Roll No"].strip())
+
+    if os.path.exists(timetable_path):
+        with open(timetable_path, newline='') as f:
+            for record in csv.DictReader(f):
+                roster = record["Roster"].strip()
+                if roster not in rosters:
+                    raise ValueError(f"{timetable_path}: unknown roster {roster!r}")
+                day = DAYS.index(record["Day"].strip()[:3].title())
+                timetable[day].append((parse_minutes(record["Start"]), parse_minutes(record["End"]), roster))
+    for periods in timetable.values():
+        periods.sort()
+    return rosters, timetable
+
+
+def parse_minutes(clock):
+    hours, minutes = clock.strip().split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def scheduled_roster(timetable, now=None):
+    # Roster whose period contains `now`, or None outside the timetable
+    now = now or datetime.now()
+    minute = now.hour * 60 + now.minute
+    for start, end, roster in timetable.get(now.weekday(), []):
+        if start <= minute < end:
+            return roster
+    return None
+
+
+class RosterMatcher:
+    """Matches faces against the class scheduled in the room, falling back to everyone.
+
+    Each roster is a MatcherView built once, up front: the row indices of its students in
+    the one full matcher, so a student on six rosters is still stored once. Switching periods
+    only swaps which view is active, so per-frame cost follows class size, not campus size.
+    Faces the active roster cannot place above the threshold go to the full gallery, so
+    visitors and students from other classes are still recognised or reported as unknown
+    exactly as before. Outside the timetable the full gallery is used directly.
+    """
+
+    def __init__(self, matcher, rosters, timetable, check_interval=CHECK_INTERVAL):
+        self.full = matcher
+        self.rosters = {name: matcher.subset(roll_nos) for name, roll_nos in rosters.items()}
+        self.timetable = timetable
+        self.check_interval = check_interval
+        self.active_roster = None
+        self.active = matcher
+        self.checked_at = float("-inf")
+        self.roster_faces = 0
+        self.fallback_faces = 0
+
+    def __len__(self):
+        return len(self.full)
+
+    def select(self, roster):
+        # O(1): the views were built in __init__
+        self.active_roster = roster
+        self.active = self.rosters[roster] if roster is not None else self.full
+
+    def refresh(self, now=None):
+        self.checked_at = time.monotonic()
+        roster = scheduled_roster(self.timetable, now)
+        if roster != self.active_roster:
+            self.select(roster)
+
+    def identify(self, face_encodings, confidence_threshold=0.7):
+        if time.monotonic() - self.checked_at >= self.check_interval:
+            self.refresh()
+        active = self.active
+        identities = active.identify(face_encodings, confidence_threshold)
+        if active is self.full:
+            return identities
+
+        # Strangers to this class get a second look against the whole gallery, in one batch
+        self.roster_faces += len(identities)
+        misses = [i for i, identity in enumerate(identities) if identity[1] == UNKNOWN_ROLL_NO]
+        if misses:
+            self.fallback_faces += len(misses)
+            face_encodings = [face_encodings[i] for i in misses]
+            for i, identity in zip(misses, self.full.identify(face_encodings, confidence_threshold)):
+                identities[i] = identity
+        return identities
+
+
+def with_rosters(matcher, directory=ROSTER_DIRECTORY):
+    # Wrap a full-gallery matcher in a RosterMatcher when rosters are configured
+    rosters, timetable = load_rosters(directory)
+    return RosterMatcher(matcher, rosters, timetable) if rosters else matcher
+
+
+if __name__ == "__main__":
+    from gallery import GALLERY_DIRECTORY, load_gallery  # Packed face gallery
+    from matcher import FaceMatcher  # Vectorized face matcher
+
+    parser = argparse.ArgumentParser(description="Check class rosters and the timetable against the gallery.")
+    parser.add_argument("--roster-dir", default=ROSTER_DIRECTORY)
+    parser.add_argument("--gallery-dir", default=GALLERY_DIRECTORY)
+    parser.add_argument("--at", default=None, help="show the roster scheduled at this DD-MM-YYYY HH:MM instead of now")
+    args = parser.parse_args()
+
+    rosters, timetable = load_rosters(args.roster_dir)
+    gallery = load_gallery(args.gallery_dir)
+    for name, roll_nos in sorted(rosters.items()):
+        missing = [roll_no for roll_no in roll_nos if not gallery.has_student(roll_no)]
+        print(f"{name}: {len(roll_nos)} students, {len(missing)} not enrolled{' (' + ', '.join(missing[:10]) + ')' if missing else ''}")
+    at = datetime.strptime(args.at, "%d-%m-%Y %H:%M") if args.at else datetime.now()
+    roster = scheduled_roster(timetable, at)
+    full = FaceMatcher.from_gallery(gallery)
+    size = len(full.subset(rosters[roster])) if roster else len(full)
+    print(f"At {at:%a %H:%M}: {roster or 'no class scheduled (full gallery)'}, matching against {size} of {len(full)} students")
@@ -0,0 +1,83 @@
+# Standard libraries
+import threading  # Cost reports arrive from the detection workers
+
+# Third-party libraries
+import cv2  # OpenCV for computer vision tasks
+import numpy as np  # NumPy for numerical operations
+
+
+class FrameScheduler:
+    """Decides which captured frames are worth running the face detector on.
+
+    Every frame is shrunk to a tiny grayscale thumbnail and compared with a slowly updated
+    background; if few pixels changed and no faces were seen recently the scene counts as
+    idle and the detector only runs every idle_interval seconds. Otherwise the detector
+    runs as often as the budget allows: the gap between detections is the larger of
+    1 / target_fps and the measured detection cost divided by cpu_budget (the share of one
+    core detection may use). A scene change after an idle spell triggers detection at once.
+    """
+
+    def __init__(self, target_fps=10.0, cpu_budget=0.5, idle_interval=2.0, motion_threshold=0.01,
+                 pixel_threshold=18, face_hold=3.0, thumbnail_size=(64, 48), background_rate=0.05):
+        self.target_fps = target_fps
+        self.cpu_budget = cpu_budget
+        self.idle_interval = idle_interval
+        self.motion_threshold = motion_threshold  # Fraction of thumbnail pixels that must change
+        self.pixel_threshold = pixel_threshold  # Grey-level change that counts as a changed pixel
+        self.face_hold = face_hold  # Stay active this long after the last detected face
+        self.thumbnail_size = thumbnail_size
+        self.background_rate = background_rate
+
+        self.background = None
+        self.detection_cost = 0.0  # Exponential moving average of seconds per detected frame
+        self.last_detection_at = float("-inf")
+        self.last_face_at = float("-inf")
+        self.active = True
+        self.motion = 0.0
+        self.skipped_frames = 0
+        self.scheduled_frames = 0
+        self.lock = threading.Lock()
+
+    def measure_motion(self, frame):
+        # Fraction of thumbnail pixels that differ from the running background
+        thumbnail = cv2.cvtColor(cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY).astype(np.float32)
+        if self.background is None:
+            self.background = thumbnail
+            return 1.0
+        changed = np.count_nonzero(np.abs(thumbnail - self.background) > self.pixel_threshold) / thumbnail.size
+        cv2.accumulateWeighted(thumbnail, self.background, self.background_rate)
+        return changed
+
+    def min_interval(self):
+        # Seconds between detections allowed by the FPS target and the CPU budget
+        interval = 1.0 / self.target_fps if self.target_fps else 0.0
+        if self.cpu_budget:
+            interval = max(interval, self.detection_cost / self.cpu_budget)
+        return interval
+
+    def should_process(self, frame, now):
+        with self.lock:
+            self.motion = self.measure_motion(frame)
+            was_active = self.active
+            self.active = self.motion >= self.motion_threshold or now - self.last_face_at < self.face_hold
+
+            if self.active and not was_active:
+                due = True  # Someone just walked in: burst back to full rate immediately
+            elif self.active:
+                due = now - self.last_detection_at >= self.min_interval()
+            else:
+                due = now - self.last_detection_at >= self.idle_interval
+
+            if due:
+                self.last_detection_at = now
+                self.scheduled_frames += 1
+            else:
+                self.skipped_frames += 1
+            return due
+
+    def record_detection(self, seconds, faces, now):
+        # Called by the detection workers after each frame they process
+        with self.lock:
+            self.detection_cost = seconds if not self.detection_cost else 0.8 * self.detection_cost + 0.2 * seconds
+            if faces:
+                self.last_face_at = now
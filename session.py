@@ -0,0 +1,217 @@
+# Standard libraries
+import time  # Stats reporting interval
+import threading  # Background workers
+
+# Python's built-in libraries
+from datetime import datetime  # Date and time handling
+
+# OpenCV, NumPy and the recognition modules are imported on the worker threads, which the
+# warm-up thread has normally loaded already; the GUI thread only imports this module
+
+PREVIEW_WIDTH = 640
+STATS_INTERVAL = 0.5  # Seconds between counter updates sent to the GUI
+
+
+def encode_preview(frame, width=PREVIEW_WIDTH):
+    # Shrink a BGR frame and encode it as binary PPM, which Tk's PhotoImage reads natively
+    import cv2
+
+    height = frame.shape[0] * width // frame.shape[1]
+    return cv2.imencode(".ppm", cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA))[1].tobytes()
+
+
+def draw_identities(frame, face_locations, identities):
+    import cv2
+
+    for (top, right, bottom, left), (name, roll_no, confidence) in zip(face_locations, identities):
+        # Draw a Golden rectangle around the face
+        cv2.rectangle(frame, (left, top), (right, bottom), (0, 165, 255), 2)
+        cv2.putText(frame, f"{name}-{roll_no}" if roll_no else name, (left, bottom + 20), cv2.FONT_HERSHEY_DUPLEX, 1.0, (0, 165, 255), 2)
+
+
+def recognised_today(attendance_log, today=None):
+    # Students whose latest mark falls on today's date
+    today = today or datetime.now().date()
+    return sum(marked_at.date() == today for marked_at in list(attendance_log.last_attendance_time.values()))
+
+
+class AttendanceSession:
+    """One take_attendance session running on a background thread.
+
+    The worker owns the camera, the recognition pipeline and the attendance writes. It
+    reports to the GUI only through `events`, a queue.Queue of (kind, payload) tuples that
+    the Tk thread drains with after(): "status" and "stats" updates, "marked" for each new
+    attendance record, "error", and "stopped" once the camera has been released. The
+    latest annotated frame is left in `preview` as PPM bytes for the GUI to pick up.
+    """
+
+    def __init__(self, preloader, attendance_log, events, confidence_threshold=0.7, camera=1, detector=None,
+                 scheduler=None, metrics_path="csv_data/metrics.json", metrics_interval=10.0):
+        self.preloader = preloader
+        self.attendance_log = attendance_log
+        self.events = events
+        self.confidence_threshold = confidence_threshold
+        self.camera = camera
+        self.detector = detector
+        self.scheduler = scheduler
+        self.metrics_path = metrics_path
+        self.metrics_interval = metrics_interval
+
+        self.preview = None
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="attendance-session", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        # Non-blocking; the worker posts "stopped" once it has shut everything down
+        self.stop_event.set()
+
+    def is_running(self):
+        return self.thread.is_alive()
+
+    def _run(self):
+        try:
+            self.events.put(("status", "Loading the recognition models..."))
+            self.preloader.wait()
+            self._recognise()
+        except Exception as error:  # Reported in the GUI instead of killing the thread silently
+            self.events.put(("error", str(error)))
+        finally:
+            self.events.put(("stopped", None))
+
+    def _recognise(self):
+        from pipeline import RecognitionPipeline, open_video_capture
+        from scheduler import FrameScheduler
+        from metrics import Metrics, MetricsExporter
+        from matcher import UNKNOWN_ROLL_NO
+        from tracker import PENDING_ROLL_NO
+
+        # The stacked gallery stays warm between sessions and is only rebuilt after it changes
+        matcher = self.preloader.matcher()
+        video_capture = open_video_capture(self.camera)
+        scheduler = self.scheduler or FrameScheduler()
+        metrics = Metrics()
+        exporter = MetricsExporter(metrics, self.metrics_path, self.metrics_interval).start() if self.metrics_path else None
+        pipeline = RecognitionPipeline(video_capture, matcher, self.confidence_threshold, detector=self.detector,
+                                       scheduler=scheduler, metrics=metrics).start()
+        self.events.put(("status", "Taking attendance"))
+
+        known_tracks, unknown_tracks = set(), set()
+        today = recognised_today(self.attendance_log)
+        shown_result = False
+        last_stats = 0.0
+        try:
+            while not self.stop_event.is_set():
+                result = pipeline.next_result()
+                if result is None:
+                    # Show the camera straight away, and keep the preview live while the scheduler idles
+                    if (not shown_result or not scheduler.active) and pipeline.latest_frame is not None:
+                        self.preview = encode_preview(pipeline.latest_frame)
+                else:
+                    shown_result = True
+                    frame = result.frame
+                    with metrics.time("overlay"):
+                        draw_identities(frame, result.face_locations, result.identities)
+                        metrics.draw_overlay(frame)
+                        self.preview = encode_preview(frame)
+
+                    with metrics.time("attendance_write"):
+                        for track_id, (name, roll_no, confidence) in zip(result.track_ids, result.identities):
+                            if roll_no == PENDING_ROLL_NO:
+                                continue  # Not matched yet; neither known nor unknown
+                            if roll_no == UNKNOWN_ROLL_NO:
+                                unknown_tracks.add(track_id)
+                                continue
+                            known_tracks.add(track_id)
+                            # Mark attendance if the 24 hour interval since the last mark is reached
+                            if self.attendance_log.mark(name, roll_no):
+                                metrics.increment("attendance_marked")
+                                today += 1
+                                self.events.put(("marked", (name, roll_no)))
+                    metrics.frame_displayed(result.captured_at)
+
+                now = time.monotonic()
+                if now - last_stats >= STATS_INTERVAL:
+                    last_stats = now
+                    # A track counts as unknown only if it was never identified
+                    self.events.put(("stats", {"recognised_today": today, "unknowns": len(unknown_tracks - known_tracks),
+                                               "fps": metrics.fps()}))
+        finally:
+            # Stop the pipeline threads and release the camera
+            pipeline.stop()
+            if exporter is not None:
+                exporter.stop()
+            video_capture.release()
+            # Make sure this session's records are on disk before anyone opens the CSV
+            self.attendance_log.flush()
+
+
+class RegistrationJob:
+    """Captures, checks and enrolls one student on a background thread.
+
+    Posts ("status", text) while it works and finishes with ("registration", (ok, message)).
+    Preview frames are left in `preview` as PPM bytes, like AttendanceSession.
+    """
+
+    def __init__(self, preloader, name, roll_no, events, camera=1, num_samples=5):
+        self.preloader = preloader
+        self.name = name
+        self.roll_no = roll_no
+        self.events = events
+        self.camera = camera
+        self.num_samples = num_samples
+
+        self.preview = None
+        self.thread = threading.Thread(target=self._run, name="registration", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def is_running(self):
+        return self.thread.is_alive()
+
+    def _on_preview(self, frame):
+        self.preview = encode_preview(frame)
+
+    def _run(self):
+        try:
+            self.events.put(("status", "Loading the recognition models..."))
+            self.preloader.wait()
+            self.events.put(("registration", self._register()))
+        except Exception as error:
+            self.events.put(("registration", (False, str(error))))
+
+    def _register(self):
+        from pipeline import open_video_capture
+        from ann_index import refresh_index
+        from registration import register_from_camera
+
+        # Adding samples under an enrolled roll number would also rename that student; like
+        # bulk_enroll without --append, refuse instead of guessing
+        gallery = self.preloader.gallery()
+        existing = gallery.student(self.roll_no)
+        if existing is not None:
+            return False, f"Roll number {self.roll_no} is already registered to {existing[0]}."
+
+        self.events.put(("status", f"Scanning {self.name} {self.roll_no}"))
+        # Capture a burst, keep the sharpest and most varied frames and encode them in parallel
+        video_capture = open_video_capture(self.camera)
+        try:
+            result = register_from_camera(video_capture, self.roll_no, gallery, self.num_samples, on_preview=self._on_preview)
+        finally:
+            video_capture.release()
+
+        if len(result.encodings) < self.num_samples:
+            return False, "Could not capture a clear view of a single face. Please try again."
+        if result.duplicate is not None:
+            duplicate_name, duplicate_roll_no, _ = result.duplicate
+            return False, f"This face is already registered as {duplicate_name} {duplicate_roll_no}."
+
+        # Append all captured samples to the gallery in one go
+        gallery.add_student(self.name, self.roll_no, result.encodings)
+        refresh_index(gallery)
+        return True, f"Student {self.name} {self.roll_no} registered successfully!"
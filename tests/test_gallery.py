@@ -0,0 +1,49 @@
+import numpy as np
+
+from gallery import ENCODING_SIZE, FaceGallery
+
+
+def encodings(count, seed=0):
+    return np.random.default_rng(seed).normal(0, 0.1, (count, ENCODING_SIZE))
+
+
+def enrolled(directory):
+    gallery = FaceGallery(directory)
+    gallery.add_student("A", "1", encodings(2, 1))
+    gallery.add_student("B", "2", encodings(2, 2))
+    return gallery
+
+
+def test_torn_manifest_line_is_truncated_before_the_next_append(tmp_path):
+    gallery = enrolled(tmp_path)
+    with open(gallery.manifest_path, 'ab') as f:
+        f.write(b"3,C")  # Crash part-way through appending a row
+
+    gallery = FaceGallery(tmp_path).load()
+    assert len(gallery.rows) == 4
+    assert gallery.manifest_path.read_bytes().endswith(b"\n")
+
+    gallery.add_student("D", "4", encodings(1, 4))
+    gallery = FaceGallery(tmp_path).load()
+    assert gallery.rows[-1] == ("4", "D", 1)
+    assert gallery.student("4") == ("D", [4])
+    assert len(gallery.encodings) == 5
+
+
+def test_row_with_cut_off_sample_number_is_dropped(tmp_path):
+    gallery = enrolled(tmp_path)
+    with open(gallery.manifest_path, 'ab') as f:
+        f.write(b"3,C,")
+
+    gallery = FaceGallery(tmp_path).load()
+    assert [roll_no for roll_no, _, _ in gallery.rows] == ["1", "1", "2", "2"]
+
+
+def test_unreferenced_matrix_rows_are_dropped(tmp_path):
+    gallery = enrolled(tmp_path)
+    with open(gallery.matrix_path, 'ab') as f:
+        f.write(encodings(1, 3).astype(np.float32).tobytes())
+
+    gallery = FaceGallery(tmp_path).load()
+    assert gallery.matrix_path.stat().st_size == 4 * ENCODING_SIZE * 4
+    assert len(gallery.known_faces()[1]) == 4
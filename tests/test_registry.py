@@ -0,0 +1,29 @@
+from registry import StudentRegistry
+
+
+def test_torn_journal_line_is_ignored_and_truncated(tmp_path):
+    registry = StudentRegistry(tmp_path)
+    registry.add_rows("1", "A", [0, 1])
+    registry.rename("1", "Alice")
+    with open(registry.journal_path, 'ab') as f:
+        f.write(b'[["delete", "1"')  # Crash part-way through a commit
+
+    registry = StudentRegistry(tmp_path).load()
+    assert registry.get("1") == {"name": "Alice", "rows": [0, 1]}
+    assert registry.journal_path.read_bytes().endswith(b"\n")
+
+    registry.add_rows("2", "B", [2])
+    registry = StudentRegistry(tmp_path).load()
+    assert sorted(registry.students) == ["1", "2"]
+
+
+def test_journal_replays_over_snapshot(tmp_path):
+    registry = StudentRegistry(tmp_path)
+    registry.add_rows("1", "A", [0])
+    registry.checkpoint()
+    registry.add_rows("1", "A", [1])
+    registry.delete("1")
+    registry.add_rows("2", "B", [2])
+
+    registry = StudentRegistry(tmp_path).load()
+    assert registry.students == {"2": {"name": "B", "rows": [2]}}
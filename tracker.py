@@ -0,0 +1,136 @@
+# Standard libraries
+import threading  # Tracker state is shared by the detection workers
+
+# Third-party libraries
+import numpy as np  # NumPy for numerical operations
+
+# Local modules
+from matcher import UNKNOWN_NAME  # Name reported for unrecognised faces
+
+# Identity of a track whose first encoding has not been matched yet (another worker claimed
+# it). Deliberately not the matcher's UNKNOWN/N/A: the face has not been rejected, so it must
+# not count as an unknown; consumers skip it
+PENDING_NAME = "PENDING"
+PENDING_ROLL_NO = ""
+PENDING = (PENDING_NAME, PENDING_ROLL_NO, 0.0)
+
+
+class Track:
+    def __init__(self, track_id, box, now):
+        self.track_id = track_id
+        self.box = box  # (top, right, bottom, left) as returned by face_recognition.face_locations
+        self.identity = None  # (name, roll_no, confidence) once the matcher has seen this face
+        self.last_encoded_at = None  # When an encoding for this track was last requested
+        self.last_seen_at = now
+        self.missed = 0  # Consecutive frames without a matching detection
+
+
+def box_iou(boxes_a, boxes_b):
+    # Pairwise intersection-over-union of (top, right, bottom, left) boxes
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    top = np.maximum(a[:, None, 0], b[None, :, 0])
+    right = np.minimum(a[:, None, 1], b[None, :, 1])
+    bottom = np.minimum(a[:, None, 2], b[None, :, 2])
+    left = np.maximum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+    area_a = (a[:, 1] - a[:, 3]) * (a[:, 2] - a[:, 0])
+    area_b = (b[:, 1] - b[:, 3]) * (b[:, 2] - b[:, 0])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-6), 0.0)
+
+
+class FaceTracker:
+    """Greedy IoU tracker that gives each face a persistent track ID between frames.
+
+    Each track caches the identity the matcher last gave it, so a face is only encoded
+    again when its track is new, its identity is still uncertain (unknown, or within
+    uncertain_margin of the confidence threshold) or refresh_interval seconds have passed.
+    """
+
+    def __init__(self, confidence_threshold=0.7, iou_threshold=0.3, max_missed=5,
+                 refresh_interval=5.0, uncertain_interval=0.5, uncertain_margin=0.05):
+        self.confidence_threshold = confidence_threshold
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.refresh_interval = refresh_interval
+        self.uncertain_interval = uncertain_interval
+        self.uncertain_margin = uncertain_margin
+
+        self.tracks = {}
+        self.next_track_id = 1
+        self.last_seq = 0
+        self.encoded_faces = 0  # Faces sent to the encoder
+        self.reused_faces = 0  # Faces answered from a track's cached identity
+        self.lock = threading.Lock()
+
+    def update(self, seq, face_locations, now):
+        # Associate this frame's boxes with existing tracks. Returns (track_ids, needs_encoding)
+        # aligned with face_locations, or None when the frame is older than one already tracked.
+        with self.lock:
+            if seq <= self.last_seq:
+                return None
+            self.last_seq = seq
+
+            track_ids = list(self.tracks)
+            assigned = [None] * len(face_locations)
+            if track_ids and face_locations:
+                overlaps = box_iou([self.tracks[t].box for t in track_ids], face_locations)
+                # Greedily take the best remaining (track, face) pair until overlaps get too small
+                while overlaps.size and overlaps.max() >= self.iou_threshold:
+                    track_index, face_index = np.unravel_index(np.argmax(overlaps), overlaps.shape)
+                    assigned[face_index] = track_ids[track_index]
+                    overlaps[track_index, :] = -1
+                    overlaps[:, face_index] = -1
+
+            matched = set()
+            needs_encoding = []
+            for face_index, box in enumerate(face_locations):
+                track_id = assigned[face_index]
+                if track_id is None:
+                    track_id = self.next_track_id
+                    self.next_track_id += 1
+                    self.tracks[track_id] = Track(track_id, box, now)
+                    assigned[face_index] = track_id
+                track = self.tracks[track_id]
+                track.box = box
+                track.last_seen_at = now
+                track.missed = 0
+                matched.add(track_id)
+
+                encode = self._needs_encoding(track, now)
+                if encode:
+                    # Claim the refresh now so other workers do not encode the same face too
+                    track.last_encoded_at = now
+                    self.encoded_faces += 1
+                else:
+                    self.reused_faces += 1
+                needs_encoding.append(encode)
+
+            # Age out tracks that have not been seen for a while
+            for track_id in list(self.tracks):
+                if track_id not in matched:
+                    self.tracks[track_id].missed += 1
+                    if self.tracks[track_id].missed > self.max_missed:
+                        del self.tracks[track_id]
+
+            return assigned, needs_encoding
+
+    def _needs_encoding(self, track, now):
+        if track.last_encoded_at is None:
+            return True
+        if track.identity is None or track.identity[0] == UNKNOWN_NAME or track.identity[2] < self.confidence_threshold + self.uncertain_margin:
+            return now - track.last_encoded_at >= self.uncertain_interval
+        return now - track.last_encoded_at >= self.refresh_interval
+
+    def set_identity(self, track_id, identity):
+        with self.lock:
+            if track_id in self.tracks:
+                self.tracks[track_id].identity = identity
+
+    def identity(self, track_id):
+        with self.lock:
+            track = self.tracks.get(track_id)
+            if track is None or track.identity is None:
+                return PENDING
+            return track.identity
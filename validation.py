@@ -0,0 +1,29 @@
+# Standard libraries
+import re  # Regular expressions
+
+# Standard library only, so the Tk thread can validate input without waiting for the
+# warm-up thread to import OpenCV and dlib
+
+
+def validate_name(name):
+    # Error message for an invalid student name, or None when it is acceptable
+    # Validate user input against the pattern of no lines and tabs
+    if re.search(r'[\t\n]', name):
+        return "Name cannot contain tabs or newlines."
+    if not re.match(r'[A-Za-z ]+$', name):
+        return "Name can only contain letters and spaces."
+    return None
+
+
+def validate_roll_no(roll_no):
+    # Error message for an invalid roll number, or None when it is acceptable
+    if re.search(r'[\t\n]', roll_no):
+        return "Roll number cannot contain tabs or newlines."
+    if not re.match(r'\d{1,8}$', roll_no):
+        return "Roll number must be a number with 1 to 8 digits."
+    return None
+
+
+def validate_student(name, roll_no):
+    # Error message for an invalid name/roll number pair, or None when both are acceptable
+    return validate_name(name) or validate_roll_no(roll_no)
@@ -0,0 +1,123 @@
+# Standard libraries
+import os  # Operating system functions
+import time  # Startup timings
+import importlib  # Background imports of the heavy modules
+import threading  # Warm-up thread
+
+# Only the standard library is imported at module level: everything that pulls in NumPy,
+# OpenCV or dlib is loaded on the warm-up thread so the login window appears immediately
+HEAVY_MODULES = ("numpy", "cv2", "face_recognition", "gallery", "matcher", "ann_index", "pipeline",
+                 "registration", "scheduler", "metrics", "compact_gallery", "rosters")
+GALLERY_FILES = ("manifest.csv", "registry.json", "registry.journal", "ivf_index.npz", "matcher.json")
+ROSTER_FILES = ("rosters.csv", "timetable.csv")
+
+STARTED_AT = time.perf_counter()
+
+
+class Preloader:
+    """Imports the recognition stack and loads the gallery and matcher in the background.
+
+    The gallery and matcher are then kept warm for the life of the application. They are
+    reloaded only when the gallery files change on disk, whether through this process
+    (register/edit/delete) or another (bulk enrollment), so repeated take_attendance
+    sessions start matching at once.
+    """
+
+    def __init__(self, gallery_directory="gallery_data", roster_directory="roster_data"):
+        self.gallery_directory = gallery_directory
+        self.roster_directory = roster_directory
+        self.timings = {}  # Step name -> seconds, in the order the steps ran
+        self.ready = threading.Event()
+        self.error = None
+        self.lock = threading.Lock()
+        self._gallery = None
+        self._gallery_signature = None
+        self._matcher = None
+        self._matcher_signature = None
+        self.thread = threading.Thread(target=self._run, name="warm-up", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def mark(self, step):
+        # Record a milestone measured from process start, e.g. when a window first appears
+        self.timings[step] = time.perf_counter() - STARTED_AT
+
+    def _timed(self, step, function, *args):
+        start = time.perf_counter()
+        value = function(*args)
+        self.timings[step] = time.perf_counter() - start
+        return value
+
+    def _run(self):
+        try:
+            for module in HEAVY_MODULES:
+                self._timed(f"import {module}", importlib.import_module, module)
+            self._timed("load gallery", self.gallery)
+            self._timed("build matcher", self.matcher)
+            self._timed("warm up detector", self._warm_detector)
+            self.mark("warm-up finished")
+            print(self.report())
+        except Exception as error:  # Surfaced to the caller by wait()
+            self.error = error
+        finally:
+            self.ready.set()
+
+    @staticmethod
+    def _warm_detector():
+        # First detection call initialises dlib's HOG detector
+        import numpy as np
+        from detection import FaceDetector
+
+        detector = FaceDetector()
+        detector.detect(detector.prepare(np.zeros((120, 160, 3), dtype=np.uint8)))
+
+    def wait(self):
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    def _signature(self):
+        # Sizes and modification times of the files that define the gallery and matcher
+        signature = []
+        paths = [os.path.join(self.gallery_directory, name) for name in GALLERY_FILES]
+        paths += [os.path.join(self.roster_directory, name) for name in ROSTER_FILES]
+        for path in paths:
+            stat = os.stat(path) if os.path.exists(path) else None
+            signature.append((stat.st_size, stat.st_mtime_ns) if stat else None)
+        return tuple(signature)
+
+    def gallery(self):
+        # The warm gallery, reloaded only if its files changed since it was loaded
+        from gallery import load_gallery
+
+        with self.lock:
+            signature = self._signature()
+            if self._gallery is None or signature != self._gallery_signature:
+                self._gallery = load_gallery(self.gallery_directory)
+                self._gallery_signature = self._signature()  # Loading may have migrated npy_data
+            return self._gallery
+
+    def matcher(self):
+        # The warm matcher for the current gallery, built with its saved compact/ANN settings
+        # and narrowed to the scheduled class when rosters are configured
+        from matcher import FaceMatcher
+        from ann_index import load_index
+        from compact_gallery import load_settings
+        from rosters import with_rosters
+
+        gallery = self.gallery()
+        with self.lock:
+            if self._matcher is None or self._matcher_signature != self._gallery_signature:
+                settings = load_settings(self.gallery_directory)
+                matcher = FaceMatcher.from_gallery(gallery, index=load_index(gallery, self.gallery_directory), **settings)
+                self._matcher = with_rosters(matcher, self.roster_directory)
+                # load_index may have re-saved the index; that does not make the gallery stale
+                self._matcher_signature = self._gallery_signature = self._signature()
+            return self._matcher
+
+    def report(self):
+        lines = ["Startup time breakdown:"]
+        lines += [f"  {step:28s} {seconds * 1000:8.1f} ms" for step, seconds in self.timings.items()]
+        return "\n".join(lines)